@@ -2,33 +2,103 @@
 All API endpoints for the Essay Testing System
 Handles all GET, POST, and other HTTP endpoints
 """
-from fastapi import APIRouter, HTTPException, Depends, Response, UploadFile, File, Form
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from starlette.requests import Request
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from sqlalchemy import func, and_, case, select, insert, update, bindparam, exists, tuple_
+from sqlalchemy.orm import Session, joinedload, make_transient_to_detached, selectinload
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+import asyncio
+import base64
+import hashlib
+import logging
 import uuid
-import json
+import orjson
+from functools import lru_cache
 from datetime import datetime
 
 from pydantic import BaseModel
 
 from server.core.models import QuestionRequest, StudentResponse, GradingRequest
 from server.core.llm_service import (
-    call_together_ai, extract_json_from_response,
+    call_together_ai, stream_together_ai, extract_json_from_response,
     QUESTION_GENERATION_TEMPLATE, GRADING_TEMPLATE,
-    adjudicate_dispute_question, adjudicate_dispute_overall,
+    adjudicate_dispute_question, adjudicate_dispute_overall_by_question,
 )
-from server.core.database import get_db
+from starlette.concurrency import run_in_threadpool
+from server.core.database import SessionLocal, get_db, get_db_for_reads, run_in_session
 from server.core.db_models import (
     User, Instructor, Student, Exam, Question, Rubric,
     Submission, Answer, Regrade, SubmissionRegrade, AssignedExamDispute
 )
 from server.core.config import TOGETHER_AI_MODEL
-from server.core.auth import create_session, delete_session, get_current_user, require_auth
+from server.core.cache import TTLCache
+from server.core.auth import SESSION_TTL_SECONDS, create_session, delete_session, get_session, get_current_user, require_auth
 from server.core.file_extractor import extract_text_from_file, summarize_text
 from server.core.file_extractor import extract_text_from_file, summarize_text
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Hot statements built once at import time. Values are bound per execution, so every
+# call after the first is served from SQLAlchemy's compiled statement cache.
+QUESTIONS_FOR_EXAM = select(Question).where(
+    Question.exam_id == bindparam("exam_id")
+).order_by(Question.q_index)
+RUBRIC_FOR_QUESTION = select(Rubric).where(Rubric.question_id == bindparam("question_id"))
+# Just (id, q_index) of an exam's questions, ordered by q_index
+QUESTION_INDEXES_FOR_EXAM = select(Question.id, Question.q_index).where(
+    Question.exam_id == bindparam("exam_id")
+).order_by(Question.q_index)
+# An exam's questions (ordered by q_index) with the given submission's answer and the rubric
+# of each, in one round-trip. Both are one-to-one per question, so rows are never multiplied;
+# a NULL submission_id matches no answers.
+QUESTIONS_WITH_ANSWERS_AND_RUBRICS = select(Question, Answer, Rubric).outerjoin(
+    Answer, and_(Answer.question_id == Question.id, Answer.submission_id == bindparam("submission_id"))
+).outerjoin(
+    Rubric, Rubric.question_id == Question.id
+).where(
+    Question.exam_id == bindparam("exam_id")
+).order_by(Question.q_index)
+# An exam with the given student's latest submission (outer joined: NULL if there is none)
+EXAM_WITH_LATEST_SUBMISSION = select(Exam, Submission).outerjoin(
+    Submission, and_(Submission.exam_id == Exam.id, Submission.student_id == bindparam("student_id"))
+).where(
+    Exam.id == bindparam("exam_id")
+).order_by(Submission.submitted_at.desc()).limit(1)
+# Question ids of a submission's assigned-exam disputes (None for the overall dispute)
+DISPUTED_QUESTION_IDS_FOR_SUBMISSION = select(AssignedExamDispute.question_id).where(
+    AssignedExamDispute.submission_id == bindparam("submission_id")
+)
+# (question_id, q_index) of a submission's assigned-exam disputes; both are NULL for the
+# overall dispute
+DISPUTED_QUESTION_INDEXES_FOR_SUBMISSION = select(AssignedExamDispute.question_id, Question.q_index).outerjoin(
+    Question, Question.id == AssignedExamDispute.question_id
+).where(
+    AssignedExamDispute.submission_id == bindparam("submission_id")
+)
+
+# An answer's final score in SQL: instructor score if edited, otherwise LLM score, otherwise 0
+FINAL_ANSWER_SCORE = case(
+    (and_(Answer.instructor_edited == True, Answer.instructor_score.isnot(None)), Answer.instructor_score),
+    else_=func.coalesce(Answer.llm_score, 0.0)
+)
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    """Format a datetime as ISO 8601, passing None through"""
+    return dt.isoformat() if dt else None
+
+
+def format_utc_iso(dt: Optional[datetime]) -> Optional[str]:
+    """Format a (naive UTC) datetime as ISO 8601 with a 'Z' suffix to indicate UTC"""
+    if dt is None:
+        return None
+    iso_str = dt.isoformat()
+    if '+' in iso_str or iso_str.endswith('Z'):
+        return iso_str
+    return iso_str + 'Z'
 
 
 # ============================================================================
@@ -64,7 +134,9 @@ async def login(request: LoginRequest, response: Response, db: Session = Depends
     if user.password != request.password:
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
-    # Create session
+    # Create session (and drop any student/instructor record cached for a previous login)
+    evict_cached_student(user.id)
+    evict_cached_instructor(user.id)
     session_token = create_session(user.id, user.username)
     
     # Set cookie
@@ -73,7 +145,7 @@ async def login(request: LoginRequest, response: Response, db: Session = Depends
         value=session_token,
         httponly=True,
         samesite="lax",
-        max_age=86400  # 24 hours
+        max_age=SESSION_TTL_SECONDS  # 24 hours
     )
     
     return LoginResponse(
@@ -89,6 +161,10 @@ async def logout(request: Request, response: Response):
     """Logout endpoint - clears session"""
     session_token = request.cookies.get("session_token")
     if session_token:
+        session_data = get_session(session_token)
+        if session_data:
+            evict_cached_student(session_data["user_id"])
+            evict_cached_instructor(session_data["user_id"])
         delete_session(session_token)
     
     # Clear cookie
@@ -109,6 +185,21 @@ async def get_current_user_info(current_user: User = Depends(require_auth)):
     }
 
 
+# id of the system default instructor (it never changes once created, so the TTL only
+# bounds how long a deleted/recreated record could be missed)
+_default_instructor_cache = TTLCache(maxsize=1, ttl=300)
+
+
+def get_default_instructor_id(db: Session) -> Optional[int]:
+    """Return the id of the system default instructor, or None if it doesn't exist yet"""
+    default_instructor_id = _default_instructor_cache.get("id")
+    if default_instructor_id is None:
+        default_instructor_id = db.query(Instructor.id).filter(Instructor.email == "default@system.edu").scalar()
+        if default_instructor_id is not None:
+            _default_instructor_cache.set("id", default_instructor_id)
+    return default_instructor_id
+
+
 def get_or_create_default_instructor(db: Session) -> Instructor:
     """Get or create a default instructor for exams"""
     instructor = db.query(Instructor).filter(Instructor.email == "default@system.edu").first()
@@ -121,14 +212,38 @@ def get_or_create_default_instructor(db: Session) -> Instructor:
         db.add(instructor)
         db.commit()
         db.refresh(instructor)
+    _default_instructor_cache.set("id", instructor.id)
     return instructor
 
 
+# Resolved instructors keyed by (user id, linked instructor id), holding plain column values
+# like _student_cache. Only a user's own (non-default) instructor record is cached, so the
+# "linked to default instructor" repair below still runs. Entries are dropped on login/logout.
+_instructor_cache = TTLCache(maxsize=4096, ttl=300)
+
+
+def evict_cached_instructor(user_id: int):
+    """Drop any cached instructor records for a user"""
+    _instructor_cache.invalidate(lambda key: key[0] == user_id)
+
+
+def _cache_instructor(user: User, instructor: Instructor):
+    _instructor_cache.set((user.id, instructor.id), {
+        column.name: getattr(instructor, column.name) for column in Instructor.__table__.columns
+    })
+
+
 def get_or_create_instructor_for_user(db: Session, user: User) -> Instructor:
     """Get or create an instructor record for a user"""
+    if user.instructor_id:
+        cached = _instructor_cache.get((user.id, user.instructor_id))
+        if cached is not None:
+            instructor = Instructor(**cached)
+            make_transient_to_detached(instructor)
+            return db.merge(instructor, load=False)
+    
     # Get default instructor to check against
-    default_instructor = db.query(Instructor).filter(Instructor.email == "default@system.edu").first()
-    default_instructor_id = default_instructor.id if default_instructor else None
+    default_instructor_id = get_default_instructor_id(db)
     
     if user.instructor_id:
         instructor = db.query(Instructor).filter(Instructor.id == user.instructor_id).first()
@@ -151,9 +266,11 @@ def get_or_create_instructor_for_user(db: Session, user: User) -> Instructor:
                 db.refresh(new_instructor)
                 db.refresh(user)
                 print(f"DEBUG: get_or_create_instructor_for_user - Created new instructor_id={new_instructor.id} for user={user.username}", flush=True)
+                _cache_instructor(user, new_instructor)
                 return new_instructor
             else:
                 print(f"DEBUG: get_or_create_instructor_for_user - Found existing instructor_id={instructor.id} for user={user.username}", flush=True)
+                _cache_instructor(user, instructor)
                 return instructor
     
     # Create new instructor record
@@ -172,6 +289,7 @@ def get_or_create_instructor_for_user(db: Session, user: User) -> Instructor:
     db.refresh(instructor)
     db.refresh(user)  # Refresh user to ensure instructor_id is persisted
     print(f"DEBUG: get_or_create_instructor_for_user - Created instructor_id={instructor.id} and linked to user={user.username} (user.instructor_id={user.instructor_id})", flush=True)
+    _cache_instructor(user, instructor)
     return instructor
 
 
@@ -187,9 +305,142 @@ def get_or_create_student(db: Session, student_id: str, name: str = None, email:
         db.add(student)
         db.commit()
         db.refresh(student)
+        invalidate_classes_cache()
+    return student
+
+
+# Resolved students keyed by (user id, linked student id). Holds plain column values
+# (not ORM instances) so entries can be re-attached to any request's session without
+# another SELECT. Entries expire after a few minutes and are dropped on login/logout.
+# The trigger-maintained counters aren't cached; they load from the row when accessed.
+_student_cache = TTLCache(maxsize=4096, ttl=300)
+_STUDENT_CACHED_COLUMNS = [
+    column.name for column in Student.__table__.columns
+    if column.name not in ("assigned_exams_count", "pending_disputes_count")
+]
+
+
+def evict_cached_student(user_id: int):
+    """Drop any cached student records for a user"""
+    _student_cache.invalidate(lambda key: key[0] == user_id)
+
+
+def get_current_student(
+    current_user: User = Depends(require_auth),
+    db: Session = Depends(get_db)
+) -> Student:
+    """Dependency to get the Student record for the current authenticated user
+    
+    FastAPI caches dependencies per request, so handlers declaring
+    Depends(get_current_student) resolve the student at most once per request.
+    """
+    cache_key = (current_user.id, current_user.student_id)
+    cached = _student_cache.get(cache_key)
+    if cached is not None:
+        student = Student(**cached)
+        make_transient_to_detached(student)
+        return db.merge(student, load=False)
+    
+    if current_user.user_type == "student" and current_user.student_id:
+        student = db.query(Student).filter(Student.id == current_user.student_id).first()
+        if not student:
+            raise HTTPException(status_code=404, detail="Student record not found for user")
+    else:
+        # Create or get student using username as student_id
+        student = get_or_create_student(db, current_user.username, name=current_user.username)
+    
+    _student_cache.set(cache_key, {
+        name: getattr(student, name) for name in _STUDENT_CACHED_COLUMNS
+    })
     return student
 
 
+@lru_cache(maxsize=1024)
+def _parse_rubric_text(rubric_text: str, fallback_key: str) -> Dict[str, Any]:
+    try:
+        return orjson.loads(rubric_text)
+    except Exception:
+        return {fallback_key: rubric_text}
+
+
+def parse_rubric(rubric: Optional[Rubric], fallback_key: str = "text") -> Dict[str, Any]:
+    """Parse a rubric's JSON text, falling back to {fallback_key: raw text} if it isn't JSON
+    
+    Parsed rubrics are cached by their text, so repeated loads of the same exam skip
+    re-parsing. The returned dict is shared between callers and must not be modified.
+    """
+    if not rubric:
+        return {}
+    return _parse_rubric_text(rubric.rubric_text, fallback_key)
+
+
+def load_rubrics_by_question(db: Session, question_ids: List[int]) -> Dict[int, Rubric]:
+    """Load the rubrics of several questions in one query, keyed by question_id"""
+    if not question_ids:
+        return {}
+    return {
+        rubric.question_id: rubric
+        for rubric in db.query(Rubric).filter(Rubric.question_id.in_(question_ids))
+    }
+
+
+@lru_cache(maxsize=1024)
+def _format_rubric_text(rubric_text: Optional[str]) -> str:
+    rubric_data = _parse_rubric_text(rubric_text, "text") if rubric_text else {}
+    return orjson.dumps(rubric_data, option=orjson.OPT_INDENT_2).decode()
+
+
+def rubric_prompt_text(rubric: Optional[Rubric]) -> str:
+    """Pretty-printed rubric JSON as embedded in grading prompts (cached by rubric text)"""
+    return _format_rubric_text(rubric.rubric_text if rubric else None)
+
+
+# Response payloads of finalized (submitted) submissions, keyed by (view, exam id, submission id).
+# Entries are invalidated whenever grades, disputes or the exam's questions change.
+results_cache = TTLCache(maxsize=2048, ttl=300)
+
+
+def invalidate_submission_results(submission_id: int):
+    """Drop cached result payloads for a submission"""
+    results_cache.invalidate(lambda key: key[2] == submission_id)
+
+
+def invalidate_exam_results(exam_id: int):
+    """Drop cached result payloads for every submission of an exam"""
+    results_cache.invalidate(lambda key: key[1] == exam_id)
+
+
+# (id, q_index) of each exam's questions keyed by exam id. An exam's questions only change
+# when the exam is edited, which invalidates its entry.
+_exam_questions_cache = TTLCache(maxsize=512, ttl=300)
+
+
+def get_exam_question_indexes(db: Session, exam_id: int) -> List[Tuple[int, int]]:
+    """(id, q_index) of an exam's questions ordered by q_index, cached per exam"""
+    cached = _exam_questions_cache.get(exam_id)
+    if cached is not None:
+        return cached
+    question_indexes = [tuple(row) for row in db.execute(QUESTION_INDEXES_FOR_EXAM, {"exam_id": exam_id})]
+    _exam_questions_cache.set(exam_id, question_indexes)
+    return question_indexes
+
+
+def invalidate_exam_questions(exam_id: int):
+    """Drop the cached question list of an exam (call after changing its questions)"""
+    _exam_questions_cache.pop(exam_id)
+
+
+# Sorted distinct class names for the instructor dashboard. Classes change rarely
+# (students are created/assigned to classes by scripts), so a short TTL is enough
+# for changes made outside this process; in-process student writes invalidate it.
+_classes_cache = TTLCache(maxsize=1, ttl=60)
+
+
+def invalidate_classes_cache():
+    """Drop the cached class list (call after creating or updating students)"""
+    _classes_cache.clear()
+
+
 # ============================================================================
 # Test Endpoint
 # ============================================================================
@@ -462,7 +713,7 @@ Uploaded Course Materials:
             db.flush()  # Get question.id
             
             # Store rubric
-            rubric_text = json.dumps(rubric_data, indent=2)
+            rubric_text = orjson.dumps(rubric_data, option=orjson.OPT_INDENT_2).decode()
             rubric = Rubric(
                 question_id=question.id,
                 rubric_text=rubric_text
@@ -563,13 +814,8 @@ async def get_student_questions(
         # Get rubrics for each question
         questions_data = []
         for question in questions:
-            rubric = db.query(Rubric).filter(Rubric.question_id == question.id).first()
-            rubric_data = {}
-            if rubric:
-                try:
-                    rubric_data = json.loads(rubric.rubric_text)
-                except:
-                    rubric_data = {"raw": rubric.rubric_text}
+            rubric = db.scalars(RUBRIC_FOR_QUESTION, {"question_id": question.id}).first()
+            rubric_data = parse_rubric(rubric, fallback_key="raw")
             
             questions_data.append({
                 "question_id": str(question.id),
@@ -579,7 +825,7 @@ async def get_student_questions(
                 "background_info": question.background_info or "",
                 "points_possible": question.points_possible,
                 "grading_rubric": rubric_data,
-                "created_at": question.created_at.isoformat() if question.created_at else None
+                "created_at": _iso(question.created_at)
             })
         
         result.append({
@@ -587,7 +833,7 @@ async def get_student_questions(
             "domain": exam.domain,
             "title": exam.title,
             "instructions_to_llm": exam.instructions_to_llm,
-            "created_at": exam.created_at.isoformat() if exam.created_at else None,
+            "created_at": _iso(exam.created_at),
             "questions": questions_data
         })
     
@@ -606,22 +852,12 @@ async def get_student_questions(
 
 @router.get("/api/my-exams", tags=["exams"])
 async def get_my_exams(
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Get all practice exams (student-generated) for the current authenticated user"""
-    # Get student record for user
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-        student_id = student.id
-        student_campus_id = student.student_id  # The string campus ID
-    else:
-        # Create or get student using username
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-        student_id = student.id
-        student_campus_id = student.student_id
+    student_id = student.id
+    student_campus_id = student.student_id  # The string campus ID
     
     # Get all submissions for PRACTICE exams only (where exam.student_id matches the student's campus ID)
     submissions = db.query(Submission).join(Exam).filter(
@@ -667,8 +903,8 @@ async def get_my_exams(
             "domain": exam.domain,
             "title": exam.title or f"{exam.domain} Exam",
             "submission_id": str(submission.id),
-            "started_at": submission.started_at.isoformat() if submission.started_at else None,
-            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+            "started_at": _iso(submission.started_at),
+            "submitted_at": _iso(submission.submitted_at),
             "total_score": round(total_score, 2),
             "max_score": round(max_score, 2),
             "percentage": round((total_score / max_score * 100), 2) if max_score > 0 else 0.0,
@@ -681,7 +917,7 @@ async def get_my_exams(
 @router.post("/api/exam/{exam_id}/start", tags=["exams"])
 async def start_exam(
     exam_id: str,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Create or get an in-progress submission for an exam"""
@@ -694,14 +930,6 @@ async def start_exam(
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
     
-    # Get student record for user
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
     # Get or create in-progress submission
     submission = db.query(Submission).filter(
         Submission.exam_id == exam_id_int,
@@ -715,8 +943,6 @@ async def start_exam(
     answer_count = db.query(Answer).filter(Answer.submission_id == submission.id).count() if submission else 0
     
     # Debug logging BEFORE any changes
-    import logging
-    logger = logging.getLogger(__name__)
     logger.warning(f"=== START EXAM DEBUG ===")
     logger.warning(f"exam_id: {exam.id}, time_limit_minutes: {exam.time_limit_minutes}")
     if submission:
@@ -816,29 +1042,17 @@ async def start_exam(
     response_end_time = submission.end_time
     
     # Debug logging
-    import logging
-    logger = logging.getLogger(__name__)
     logger.info(f"Exam start - exam_id: {exam.id}, time_limit_minutes: {exam.time_limit_minutes}")
     logger.info(f"Submission - started_at: {submission.started_at}, end_time: {response_end_time}")
     if submission.started_at and response_end_time:
         time_diff = (response_end_time - submission.started_at).total_seconds() / 60
         logger.info(f"Time difference: {time_diff} minutes")
     
-    # Ensure ISO format includes 'Z' to indicate UTC timezone
-    def format_utc_iso(dt):
-        if dt is None:
-            return None
-        # Add 'Z' suffix to indicate UTC
-        iso_str = dt.isoformat()
-        if '+' in iso_str or iso_str.endswith('Z'):
-            return iso_str
-        return iso_str + 'Z'
-    
     return {
         "submission_id": str(submission.id),
         "exam_id": str(exam.id),
         "time_limit_minutes": exam.time_limit_minutes,
-        "prevent_tab_switching": bool(exam.prevent_tab_switching) if exam.prevent_tab_switching is not None else False,
+        "prevent_tab_switching": bool(exam.prevent_tab_switching),
         "end_time": format_utc_iso(response_end_time),
         "started_at": format_utc_iso(submission.started_at)
     }
@@ -847,7 +1061,7 @@ async def start_exam(
 @router.post("/api/exam/{exam_id}/submit", tags=["exams"])
 async def submit_exam(
     exam_id: str,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Mark an exam submission as submitted (moves it to Past Exams)"""
@@ -860,14 +1074,6 @@ async def submit_exam(
     if not exam:
             raise HTTPException(status_code=404, detail="Exam not found")
 
-    # Get student record for user
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
     # Get any submission (in-progress or already submitted) for this exam and student
     submission = db.query(Submission).filter(
         Submission.exam_id == exam_id_int,
@@ -885,7 +1091,7 @@ async def submit_exam(
                 "message": "Exam already submitted",
                 "submission_id": str(submission.id),
                 "exam_id": str(exam.id),
-                "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None
+                "submitted_at": _iso(submission.submitted_at)
             }
         print(f"DEBUG: Found in-progress submission {submission.id}, submitted_at={submission.submitted_at}")
     else:
@@ -914,7 +1120,7 @@ async def submit_exam(
             "message": "Exam submitted successfully",
             "submission_id": str(submission.id),
             "exam_id": str(exam.id),
-            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None
+            "submitted_at": _iso(submission.submitted_at)
         }
     
     # Mark as submitted (submission exists and is in-progress)
@@ -937,7 +1143,7 @@ async def submit_exam(
         "message": "Exam submitted successfully",
         "submission_id": str(submission.id),
         "exam_id": str(exam.id),
-        "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None
+        "submitted_at": _iso(submission.submitted_at)
     }
 
 
@@ -951,25 +1157,19 @@ async def get_assigned_exams(
         if current_user.user_type != "student":
             raise HTTPException(status_code=403, detail="Only students can access this endpoint")
         
-        # Get student record for user
-        if current_user.user_type == "student" and current_user.student_id:
-            student = db.query(Student).filter(Student.id == current_user.student_id).first()
-            if not student:
-                raise HTTPException(status_code=404, detail="Student record not found for user")
-            student_id = student.id
-        else:
-            student = get_or_create_student(db, current_user.username, name=current_user.username)
-            student_id = student.id
+        student = get_current_student(current_user, db)
+        student_id = student.id
         
         # Refresh student to ensure we have latest data including class_name
         db.refresh(student)
         
         # Get all submissions for assigned exams only (where exam.student_id is NULL)
         # This ensures we only get instructor-created exams, not student-generated practice exams
-        # Use eager loading to get exam and instructor data in one query
-        from sqlalchemy.orm import joinedload
+        # Use eager loading to get exam and instructor data in one query,
+        # and every submission's disputes with a single extra IN query
         submissions = db.query(Submission).join(Exam).options(
-            joinedload(Submission.exam).joinedload(Exam.instructor)
+            joinedload(Submission.exam).joinedload(Exam.instructor),
+            selectinload(Submission.assigned_disputes)
         ).filter(
             Submission.student_id == student_id,
             Exam.student_id.is_(None)  # Only assigned exams (instructor-created), not practice (student-generated)
@@ -978,15 +1178,6 @@ async def get_assigned_exams(
         if not submissions:
             return {"exams": []}
         
-        # Helper function to format UTC datetime with 'Z' suffix
-        def format_utc_iso(dt):
-            if dt is None:
-                return None
-            iso_str = dt.isoformat()
-            if '+' in iso_str or iso_str.endswith('Z'):
-                return iso_str
-            return iso_str + 'Z'
-        
         # Get unique exams and their status
         exam_data = {}
         for submission in submissions:
@@ -1028,31 +1219,21 @@ async def get_assigned_exams(
                         # Get question and rubric for grading
                         question = db.query(Question).filter(Question.id == answer.question_id).first()
                         if question:
-                            rubric = db.query(Rubric).filter(Rubric.question_id == question.id).first()
+                            rubric = db.scalars(RUBRIC_FOR_QUESTION, {"question_id": question.id}).first()
                             if rubric:
                                 try:
-                                    # Parse rubric
-                                    try:
-                                        rubric_data = json.loads(rubric.rubric_text)
-                                    except:
-                                        rubric_data = {"text": rubric.rubric_text}
-
                                     # Prepare grading prompt
-                                    rubric_str = json.dumps(rubric_data, indent=2)
-                                    prompt = GRADING_TEMPLATE.format(
-                                        question_text=question.prompt,
-                                        grading_rubric=rubric_str,
-                                        background_info=question.background_info or "",
-                                        domain_info=exam.domain or "",
-                                        student_response=answer.student_answer,
-                                        time_spent=0  # Unknown for auto-graded overdue exams
+                                    prompt = build_grading_prompt(
+                                        question.prompt,
+                                        rubric_prompt_text(rubric),
+                                        question.background_info,
+                                        exam.domain,
+                                        answer.student_answer,
+                                        0  # Unknown for auto-graded overdue exams
                                     )
 
                                     # Call LLM for grading
-                                    llm_response = await call_together_ai(
-                                        prompt,
-                                        system_prompt="You are an expert educator. Always return valid JSON with accurate scores."
-                                    )
+                                    llm_response = await call_together_ai(prompt, system_prompt=GRADING_SYSTEM_PROMPT)
 
                                     # Parse grading result
                                     grade_data = extract_json_from_response(llm_response)
@@ -1060,6 +1241,7 @@ async def get_assigned_exams(
                                     # Update answer with grade
                                     answer.llm_score = float(grade_data.get("total_score", 0.0))
                                     answer.llm_feedback = grade_data.get("feedback", "")
+                                    answer.grade_json = orjson.dumps(grade_data).decode()
                                     answer.graded_at = datetime.utcnow()
                                     answer.grading_model_name = TOGETHER_AI_MODEL
                                     answer.grading_temperature = 0.7
@@ -1079,7 +1261,7 @@ async def get_assigned_exams(
             is_completed = submission.submitted_at is not None
             
             # Check if student has actually started (has any answers)
-            has_answers = db.query(Answer).filter(Answer.submission_id == submission.id).count() > 0
+            has_answers = db.query(db.query(Answer).filter(Answer.submission_id == submission.id).exists()).scalar()
             
             # Only mark as in progress if it's been started (has started_at AND has answers) but not completed
             is_in_progress = not is_completed and submission.started_at is not None and has_answers
@@ -1096,10 +1278,9 @@ async def get_assigned_exams(
             # Get class name from student record (refresh to ensure we have latest)
             class_name = student.class_name if student.class_name else None
             
-            # Get dispute information for this submission
-            disputes = db.query(AssignedExamDispute).filter(
-                AssignedExamDispute.submission_id == submission.id
-            ).all()
+            # Get dispute information for this submission (eagerly loaded above,
+            # overall dispute (question_id NULL) first)
+            disputes = submission.assigned_disputes
             
             dispute_info = None
             if disputes:
@@ -1113,7 +1294,7 @@ async def get_assigned_exams(
                         "dispute_id": pending_dispute.id,
                         "target": "overall" if pending_dispute.question_id is None else "question",
                         "question_id": pending_dispute.question_id,
-                        "created_at": pending_dispute.created_at.isoformat() if pending_dispute.created_at else None,
+                        "created_at": _iso(pending_dispute.created_at),
                     }
                 elif resolved_dispute:
                     dispute_info = {
@@ -1123,8 +1304,8 @@ async def get_assigned_exams(
                         "question_id": resolved_dispute.question_id,
                         "instructor_decision": resolved_dispute.instructor_decision,
                         "instructor_response": resolved_dispute.instructor_response,
-                        "resolved_at": resolved_dispute.resolved_at.isoformat() if resolved_dispute.resolved_at else None,
-                        "created_at": resolved_dispute.created_at.isoformat() if resolved_dispute.created_at else None,
+                        "resolved_at": _iso(resolved_dispute.resolved_at),
+                        "created_at": _iso(resolved_dispute.created_at),
                     }
             
             # Debug logging
@@ -1135,14 +1316,14 @@ async def get_assigned_exams(
                 "domain": exam.domain,
                 "title": exam.title or f"{exam.domain} Exam",
                 "submission_id": str(submission.id),
-                "started_at": submission.started_at.isoformat() if submission.started_at else None,
-                "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+                "started_at": _iso(submission.started_at),
+                "submitted_at": _iso(submission.submitted_at),
                 "is_completed": is_completed,
                 "is_in_progress": is_in_progress,
                 "question_count": question_count,
                 "instructor_name": instructor_name or "Unknown Instructor",
                 "class_name": class_name or None,
-                "due_date": format_utc_iso(exam.due_date) if exam.due_date else None,
+                "due_date": format_utc_iso(exam.due_date),
                 "time_limit_minutes": exam.time_limit_minutes,
                 "is_overdue": is_overdue,
                 "dispute": dispute_info
@@ -1203,7 +1384,7 @@ async def get_my_profile(
                 "total_exams": total_exams,
                 "completed_exams": completed_exams,
                 "in_progress_exams": total_exams - completed_exams,
-                "account_created": current_user.created_at.isoformat() if current_user.created_at else None
+                "account_created": _iso(current_user.created_at)
             }
         else:
             # Instructor profile
@@ -1226,7 +1407,7 @@ async def get_my_profile(
                 "domain_expertise": instructor.domain_expertise or "General",
                 "total_exams_created": total_exams,
                 "total_students": total_students,
-                "account_created": current_user.created_at.isoformat() if current_user.created_at else None
+                "account_created": _iso(current_user.created_at)
             }
     except Exception as e:
         print(f"Error getting profile: {e}")
@@ -1237,109 +1418,92 @@ async def get_my_profile(
 
 @router.get("/api/my-exams/in-progress", tags=["exams"])
 async def get_in_progress_exams(
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Get all in-progress exams (not yet submitted) for the current authenticated user"""
     try:
-        # Get student record for user
-        if current_user.user_type == "student" and current_user.student_id:
-            student = db.query(Student).filter(Student.id == current_user.student_id).first()
-            if not student:
-                raise HTTPException(status_code=404, detail="Student record not found for user")
-            student_id = student.id
-        else:
-            # Create or get student using username
-            student = get_or_create_student(db, current_user.username, name=current_user.username)
-            student_id = student.id
+        student_id = student.id
         
         # Get student's campus ID for filtering practice exams
         student_campus_id = student.student_id  # The string campus ID
         
-        # Get all in-progress submissions (submitted_at is None)
+        # Get all in-progress submissions (submitted_at is None) together with their
+        # answer counts in a single grouped query (question counts are cached on the exam)
         # Include both practice exams (exam.student_id matches) and assigned exams (exam.student_id is NULL)
-        submissions = db.query(Submission).join(Exam).filter(
+        submissions_stmt = select(
+            Submission.id,
+            Submission.exam_id,
+            Submission.started_at,
+            Exam.domain,
+            Exam.title,
+            case((Exam.student_id == student_campus_id, True), else_=False).label("is_practice"),
+            Exam.question_count,
+            func.count(Answer.id).label("answered_count"),
+        ).join(
+            Exam, Exam.id == Submission.exam_id
+        ).outerjoin(
+            Answer, Answer.submission_id == Submission.id
+        ).where(
             Submission.student_id == student_id,
             Submission.submitted_at.is_(None),
             # Include practice exams OR assigned exams
             ((Exam.student_id == student_campus_id) | (Exam.student_id.is_(None)))
-        ).order_by(Submission.started_at.desc()).all()
+        ).group_by(Submission.id, Exam.id).order_by(Submission.started_at.desc())
         
-        # For practice exams, also check for exams that exist but don't have submissions yet
-        # (exams that were generated but never started)
-        practice_exams_without_submissions = db.query(Exam).filter(
+        # For practice exams: also include exams that were generated but never started (no submission exists yet)
+        # These are practice exams that exist but the student hasn't clicked "Start Exam" yet
+        # Anti-join: only exams this student has no submission for at all (in-progress or completed),
+        # and only exams that have questions (were fully generated)
+        has_submission = exists().where(
+            Submission.exam_id == Exam.id,
+            Submission.student_id == student_id
+        )
+        practice_stmt = select(
+            Exam.id, Exam.domain, Exam.title, Exam.question_count
+        ).where(
             Exam.student_id == student_campus_id,  # Practice exams only
-            ~Exam.id.in_([s.exam_id for s in submissions])  # Exams without submissions
-        ).all()
+            ~has_submission,
+            Exam.question_count > 0
+        ).order_by(Exam.id)
+        
+        # The two queries are independent, so run them concurrently on their own sessions
+        submission_rows, practice_exams_without_submissions = await asyncio.gather(
+            run_in_session(lambda session: session.execute(submissions_stmt).all()),
+            run_in_session(lambda session: session.execute(practice_stmt).all()),
+        )
         
         # Get exam details and current progress
         exam_data = []
         
         # Process submissions (exams that have been started)
-        for submission in submissions:
-            exam = db.query(Exam).filter(Exam.id == submission.exam_id).first()
-            if not exam:
-                continue
-            
-            # Get answers already submitted for this in-progress exam
-            answers = db.query(Answer).filter(Answer.submission_id == submission.id).all()
-            answered_count = len(answers)
+        for row in submission_rows:
+            answered_count = row.answered_count
+            question_count = row.question_count
             
             # For assigned exams: only include if actually started (have started_at AND have at least one answer)
             # For practice exams: include if started_at is set (even if no answers yet)
-            is_practice = exam.student_id == student_campus_id
-            if not is_practice:
+            if not row.is_practice:
                 # Assigned exam - must have started and have answers
-                if submission.started_at is None or answered_count == 0:
+                if row.started_at is None or answered_count == 0:
                     continue
             else:
                 # Practice exam - must have started_at (even if no answers yet)
-                if submission.started_at is None:
+                if row.started_at is None:
                     continue
             
-            # Get questions for this exam
-            questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
-            
             exam_data.append({
-                "exam_id": str(exam.id),
-                "submission_id": str(submission.id),
-                "domain": exam.domain,
-                "title": exam.title or f"{exam.domain} Exam",
-                "started_at": submission.started_at.isoformat() if submission.started_at else None,
-                "question_count": len(questions),
+                "exam_id": str(row.exam_id),
+                "submission_id": str(row.id),
+                "domain": row.domain,
+                "title": row.title or f"{row.domain} Exam",
+                "started_at": _iso(row.started_at),
+                "question_count": question_count,
                 "answered_count": answered_count,
-                "progress_percentage": round((answered_count / len(questions) * 100), 1) if questions else 0.0
+                "progress_percentage": round((answered_count / question_count * 100), 1) if question_count else 0.0
             })
         
-        # For practice exams: also include exams that were generated but never started (no submission exists yet)
-        # These are practice exams that exist but the student hasn't clicked "Start Exam" yet
-        submission_exam_ids = {s.exam_id for s in submissions} if submissions else set()
-        practice_exams_without_submissions = db.query(Exam).filter(
-            Exam.student_id == student_campus_id  # Practice exams only
-        ).all()
-        
-        # Filter out exams that already have submissions
-        practice_exams_without_submissions = [
-            exam for exam in practice_exams_without_submissions 
-            if exam.id not in submission_exam_ids
-        ]
-        
         for exam in practice_exams_without_submissions:
-            # Check if exam has questions (was fully generated)
-            questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
-            if not questions:
-                continue  # Skip exams without questions
-            
-            # Check if exam was submitted (by checking if there's any submission with submitted_at set)
-            completed_submission = db.query(Submission).filter(
-                Submission.exam_id == exam.id,
-                Submission.student_id == student_id,
-                Submission.submitted_at.isnot(None)
-            ).first()
-            
-            if completed_submission:
-                continue  # Skip completed exams
-            
             # This is a practice exam that was generated but never started
             # Include it in the in-progress list
             exam_data.append({
@@ -1348,7 +1512,7 @@ async def get_in_progress_exams(
                 "domain": exam.domain,
                 "title": exam.title or f"{exam.domain} Exam",
                 "started_at": None,  # Not started yet
-                "question_count": len(questions),
+                "question_count": exam.question_count,
                 "answered_count": 0,
                 "progress_percentage": 0.0
             })
@@ -1368,7 +1532,7 @@ async def get_in_progress_exams(
 @router.delete("/api/exam/{exam_id}/in-progress", tags=["exams"])
 async def delete_in_progress_exam(
     exam_id: str,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Delete an in-progress exam submission
@@ -1381,18 +1545,18 @@ async def delete_in_progress_exam(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid exam_id format")
     
-    # Get student record for user
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
-    # Get the exam first to check if it exists
-    exam = db.query(Exam).filter(Exam.id == exam_id_int).first()
-    if not exam:
+    # Get the exam together with the student's latest in-progress submission (if any)
+    row = db.query(Exam, Submission).outerjoin(
+        Submission,
+        and_(
+            Submission.exam_id == Exam.id,
+            Submission.student_id == student.id,
+            Submission.submitted_at.is_(None)
+        )
+    ).filter(Exam.id == exam_id_int).order_by(Submission.started_at.desc()).first()
+    if not row:
             raise HTTPException(status_code=404, detail="Exam not found")
+    exam, submission = row
 
     # Get student's campus ID for checking practice exams
     student_campus_id = student.student_id
@@ -1400,13 +1564,6 @@ async def delete_in_progress_exam(
     # Check if this is a practice exam (student-generated)
     is_practice_exam = exam.student_id == student_campus_id
     
-    # Get in-progress submission
-    submission = db.query(Submission).filter(
-        Submission.exam_id == exam_id_int,
-        Submission.student_id == student.id,
-        Submission.submitted_at.is_(None)
-    ).order_by(Submission.started_at.desc()).first()
-    
     if is_practice_exam:
         # For practice exams, delete the entire exam (which will cascade delete submissions and answers)
         # This ensures the exam is completely removed when regenerating
@@ -1427,7 +1584,7 @@ async def delete_in_progress_exam(
 @router.get("/api/exam/{exam_id}/resume", tags=["exams"])
 async def get_exam_to_resume(
     exam_id: str,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Get exam data for resuming an in-progress exam"""
@@ -1440,14 +1597,6 @@ async def get_exam_to_resume(
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
     
-    # Get student record for user
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
     # Get in-progress submission
     submission = db.query(Submission).filter(
         Submission.exam_id == exam_id_int,
@@ -1475,25 +1624,12 @@ async def get_exam_to_resume(
             # For assigned exams, they should have a submission (created when assigned)
             raise HTTPException(status_code=404, detail="No in-progress exam found")
     
-    # Load questions with rubrics, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    # Load questions with their rubrics and existing answers (if any), ordered by q_index
+    rows = db.execute(QUESTIONS_WITH_ANSWERS_AND_RUBRICS, {"exam_id": exam.id, "submission_id": submission.id}).all()
     
     questions_list = []
-    for q in questions:
-        # Get rubric for question
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-        rubric_data = {}
-        if rubric:
-            try:
-                rubric_data = json.loads(rubric.rubric_text)
-            except:
-                rubric_data = {"text": rubric.rubric_text}
-        
-        # Get existing answer if any (including grade information)
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id
-        ).first()
+    for q, answer, rubric in rows:
+        rubric_data = parse_rubric(rubric)
         
         # Include answer with grade information if it exists
         existing_answer_data = None
@@ -1502,7 +1638,7 @@ async def get_exam_to_resume(
                 "response_text": answer.student_answer,
                 "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
                 "llm_feedback": answer.llm_feedback or "",
-                "graded_at": answer.graded_at.isoformat() if answer.graded_at else None
+                "graded_at": _iso(answer.graded_at)
             }
         
         questions_list.append({
@@ -1516,23 +1652,14 @@ async def get_exam_to_resume(
             "existing_answer_data": existing_answer_data  # Include full answer data with grades
         })
     
-    # Helper function to format UTC datetime with 'Z' suffix
-    def format_utc_iso(dt):
-        if dt is None:
-            return None
-        iso_str = dt.isoformat()
-        if '+' in iso_str or iso_str.endswith('Z'):
-            return iso_str
-        return iso_str + 'Z'
-    
     return {
         "exam_id": str(exam.id),
         "domain": exam.domain,
         "title": exam.title or f"{exam.domain} Exam",
         "submission_id": str(submission.id),
         "time_limit_minutes": exam.time_limit_minutes,
-        "prevent_tab_switching": bool(exam.prevent_tab_switching) if exam.prevent_tab_switching is not None else False,
-        "due_date": format_utc_iso(exam.due_date) if exam.due_date else None,
+        "prevent_tab_switching": bool(exam.prevent_tab_switching),
+        "due_date": format_utc_iso(exam.due_date),
         "end_time": format_utc_iso(submission.end_time),
         "questions": questions_list
     }
@@ -1541,7 +1668,7 @@ async def get_exam_to_resume(
 @router.get("/api/exam/{exam_id}/my-results", tags=["exams"])
 async def get_my_exam_results(
     exam_id: str,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
     """Get exam results for the current authenticated user"""
@@ -1554,16 +1681,10 @@ async def get_my_exam_results(
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
     
-    # Get student record for user
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        # Create or get student using username
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
-    submission = db.query(Submission).filter(
+    # Load the submission together with its disputes (selectinload avoids multiplying rows)
+    submission = db.query(Submission).options(
+        selectinload(Submission.assigned_disputes)
+    ).filter(
         Submission.exam_id == exam_id_int,
         Submission.student_id == student.id
     ).order_by(Submission.started_at.desc()).first()
@@ -1571,29 +1692,24 @@ async def get_my_exam_results(
     if not submission:
         raise HTTPException(status_code=404, detail="No submission found for this exam")
     
-    # Load questions with rubrics, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    # Results of a submitted exam only change through grade edits/disputes, which invalidate the cache
+    cache_key = ("my-results", exam.id, submission.id)
+    if submission.submitted_at is not None:
+        cached = results_cache.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+    
+    # Load questions with their rubrics and this submission's answers, ordered by q_index
+    # (one-to-one mapping: one answer per question)
+    rows = db.execute(QUESTIONS_WITH_ANSWERS_AND_RUBRICS, {"exam_id": exam.id, "submission_id": submission.id}).all()
     
     questions_with_answers = []
     total_score = 0.0
     max_score = 0.0
     has_instructor_edits = False
     
-    for q in questions:
-        # Get rubric for question
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-        rubric_data = {}
-        if rubric:
-            try:
-                rubric_data = json.loads(rubric.rubric_text)
-            except:
-                rubric_data = {"text": rubric.rubric_text}
-        
-        # Get answer for this question (one-to-one mapping: one answer per question)
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id  # Exact one-to-one mapping
-        ).first()
+    for q, answer, rubric in rows:
+        rubric_data = parse_rubric(rubric)
         
         answer_data = None
         if answer:
@@ -1608,12 +1724,12 @@ async def get_my_exam_results(
                 "response_text": answer.student_answer,
                 "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
                 "llm_feedback": answer.llm_feedback or "",
-                "graded_at": answer.graded_at.isoformat() if answer.graded_at else None,
+                "graded_at": _iso(answer.graded_at),
                 "grading_model_name": answer.grading_model_name,
-                "instructor_edited": bool(answer.instructor_edited) if answer.instructor_edited is not None else False,
+                "instructor_edited": bool(answer.instructor_edited),
                 "instructor_score": float(answer.instructor_score) if answer.instructor_score is not None else None,
                 "instructor_feedback": answer.instructor_feedback or "",
-                "instructor_edited_at": answer.instructor_edited_at.isoformat() if answer.instructor_edited_at else None,
+                "instructor_edited_at": _iso(answer.instructor_edited_at),
                 "final_score": final_score  # The score that should be displayed (instructor or LLM)
             }
             
@@ -1635,9 +1751,7 @@ async def get_my_exam_results(
     percentage = round((total_score / max_score * 100), 2) if max_score > 0 else 0.0
     
     # Get dispute information for this submission
-    disputes = db.query(AssignedExamDispute).filter(
-        AssignedExamDispute.submission_id == submission.id
-    ).all()
+    disputes = submission.assigned_disputes
     
     dispute_info = None
     if disputes:
@@ -1652,7 +1766,7 @@ async def get_my_exam_results(
                 "target": "overall" if pending_dispute.question_id is None else "question",
                 "question_id": pending_dispute.question_id,
                 "student_argument": pending_dispute.student_argument,
-                "created_at": pending_dispute.created_at.isoformat() if pending_dispute.created_at else None,
+                "created_at": _iso(pending_dispute.created_at),
             }
         elif resolved_dispute:
             dispute_info = {
@@ -1663,17 +1777,17 @@ async def get_my_exam_results(
                 "student_argument": resolved_dispute.student_argument,
                 "instructor_decision": resolved_dispute.instructor_decision,
                 "instructor_response": resolved_dispute.instructor_response,
-                "resolved_at": resolved_dispute.resolved_at.isoformat() if resolved_dispute.resolved_at else None,
-                "created_at": resolved_dispute.created_at.isoformat() if resolved_dispute.created_at else None,
+                "resolved_at": _iso(resolved_dispute.resolved_at),
+                "created_at": _iso(resolved_dispute.created_at),
             }
     
-    return {
+    result = {
         "exam_id": str(exam.id),
         "exam_title": exam.title,
         "domain": exam.domain,
         "submission_id": str(submission.id),
         "student_id": student.student_id,
-        "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+        "submitted_at": _iso(submission.submitted_at),
         "total_score": round(total_score, 2),
         "max_score": round(max_score, 2),
         "percentage": percentage,
@@ -1681,6 +1795,9 @@ async def get_my_exam_results(
         "questions_with_answers": questions_with_answers,  # Each question has exactly one answer or None
         "dispute": dispute_info
     }
+    if submission.submitted_at is not None:
+        results_cache.set(cache_key, result)
+    return ORJSONResponse(result)
 
 
 @router.get("/api/exam/{exam_id}/with-answers", tags=["exams"])
@@ -1711,25 +1828,20 @@ async def get_exam_with_answers(exam_id: str, student_id: str, db: Session = Dep
     if not submission:
         raise HTTPException(status_code=404, detail="No submission found for this student and exam")
     
-    # Load questions with rubrics, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    # Results of a submitted exam only change through grade edits/disputes, which invalidate the cache
+    cache_key = ("with-answers", exam.id, submission.id)
+    if submission.submitted_at is not None:
+        cached = results_cache.get(cache_key)
+        if cached is not None:
+            return ORJSONResponse(cached)
+    
+    # Load questions with their rubrics and this submission's answers, ordered by q_index
+    # (one-to-one mapping: one answer per question)
+    rows = db.execute(QUESTIONS_WITH_ANSWERS_AND_RUBRICS, {"exam_id": exam.id, "submission_id": submission.id}).all()
     
     questions_with_answers = []
-    for q in questions:
-        # Get rubric for question
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-        rubric_data = {}
-        if rubric:
-            try:
-                rubric_data = json.loads(rubric.rubric_text)
-            except:
-                rubric_data = {"text": rubric.rubric_text}
-        
-        # Get answer for this question (one-to-one mapping: one answer per question)
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id  # Exact one-to-one mapping
-        ).first()
+    for q, answer, rubric in rows:
+        rubric_data = parse_rubric(rubric)
         
         answer_data = None
         if answer:
@@ -1738,7 +1850,7 @@ async def get_exam_with_answers(exam_id: str, student_id: str, db: Session = Dep
                 "response_text": answer.student_answer,
                 "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
                 "llm_feedback": answer.llm_feedback or "",
-                "graded_at": answer.graded_at.isoformat() if answer.graded_at else None,
+                "graded_at": _iso(answer.graded_at),
                 "grading_model_name": answer.grading_model_name
             }
         
@@ -1751,15 +1863,18 @@ async def get_exam_with_answers(exam_id: str, student_id: str, db: Session = Dep
             "answer": answer_data  # One-to-one: exactly one answer or None
         })
     
-    return {
+    result = {
         "exam_id": str(exam.id),
         "exam_title": exam.title,
         "domain": exam.domain,
         "submission_id": str(submission.id),
         "student_id": student_id,
-        "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+        "submitted_at": _iso(submission.submitted_at),
         "questions_with_answers": questions_with_answers  # Each question has exactly one answer or None
     }
+    if submission.submitted_at is not None:
+        results_cache.set(cache_key, result)
+    return ORJSONResponse(result)
 
 
 @router.get("/api/exam/{exam_id}", tags=["exams"])
@@ -1784,37 +1899,28 @@ async def get_exam(exam_id: str, student_id: str = None, db: Session = Depends(g
                 Submission.student_id == student.id
             ).order_by(Submission.started_at.desc()).first()
     
-    # Load questions with rubrics, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    # Load questions with their rubrics and the submission's answers (if there is a
+    # submission), ordered by q_index
+    rows = db.execute(
+        QUESTIONS_WITH_ANSWERS_AND_RUBRICS,
+        {"exam_id": exam.id, "submission_id": submission.id if submission else None}
+    ).all()
     
     questions_list = []
-    for q in questions:
-        # Get rubric for question
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-        rubric_data = {}
-        if rubric:
-            try:
-                rubric_data = json.loads(rubric.rubric_text)
-            except:
-                rubric_data = {"text": rubric.rubric_text}
+    for q, answer, rubric in rows:
+        rubric_data = parse_rubric(rubric)
         
-        # Get answer for this question if submission exists (one-to-one mapping)
+        # Answer for this question if submission exists (one-to-one mapping)
         answer_data = None
-        if submission:
-            answer = db.query(Answer).filter(
-                Answer.submission_id == submission.id,
-                Answer.question_id == q.id
-            ).first()
-            
-            if answer:
-                answer_data = {
-                    "answer_id": str(answer.id),
-                    "response_text": answer.student_answer,
-                    "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
-                    "llm_feedback": answer.llm_feedback or "",
-                    "graded_at": answer.graded_at.isoformat() if answer.graded_at else None,
-                    "grading_model_name": answer.grading_model_name
-                }
+        if answer:
+            answer_data = {
+                "answer_id": str(answer.id),
+                "response_text": answer.student_answer,
+                "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
+                "llm_feedback": answer.llm_feedback or "",
+                "graded_at": _iso(answer.graded_at),
+                "grading_model_name": answer.grading_model_name
+            }
         
         questions_list.append({
             "question_id": str(q.id),
@@ -1831,7 +1937,7 @@ async def get_exam(exam_id: str, student_id: str = None, db: Session = Depends(g
         "exam_id": str(exam.id),
         "domain": exam.domain,
         "title": exam.title,
-        "created_at": exam.created_at.isoformat() if exam.created_at else None,
+        "created_at": _iso(exam.created_at),
         "questions": questions_list
     }
 
@@ -1840,173 +1946,226 @@ async def get_exam(exam_id: str, student_id: str = None, db: Session = Depends(g
 # Response Submission and Grading Endpoints
 # ============================================================================
 
+GRADING_SYSTEM_PROMPT = "You are an expert educator. Always return valid JSON with accurate scores."
+
+
+# GRADING_TEMPLATE split around the per-response fields: everything before the student's
+# response depends only on the question, and the instructions after it are constant
+_GRADING_PREFIX_TEMPLATE, _grading_suffix_template = GRADING_TEMPLATE.split("{student_response}")
+_GRADING_TIME_LABEL, _grading_instructions_template = _grading_suffix_template.split("{time_spent}")
+_GRADING_INSTRUCTIONS = _grading_instructions_template.format()  # unescape {{ }}
+
+
+@lru_cache(maxsize=1024)
+def grading_prompt_prefix(
+    question_text: str,
+    grading_rubric: str,
+    background_info: Optional[str],
+    domain: Optional[str]
+) -> str:
+    """Question-specific start of the grading prompt (cached, identical for every response)"""
+    return _GRADING_PREFIX_TEMPLATE.format(
+        question_text=question_text,
+        grading_rubric=grading_rubric,
+        background_info=background_info or "",
+        domain_info=domain or ""
+    )
+
+
+def build_grading_prompt(
+    question_text: str,
+    grading_rubric: str,
+    background_info: Optional[str],
+    domain: Optional[str],
+    response_text: str,
+    time_spent_seconds: Optional[int]
+) -> str:
+    """Build the LLM grading prompt for one student response (same text as GRADING_TEMPLATE.format)"""
+    return "".join((
+        grading_prompt_prefix(question_text, grading_rubric, background_info, domain),
+        response_text,
+        _GRADING_TIME_LABEL,
+        str(time_spent_seconds or 0),
+        _GRADING_INSTRUCTIONS
+    ))
+
+
+def get_or_create_in_progress_submission(db: Session, exam_id: int, student: Student) -> Submission:
+    """Get the student's in-progress submission for an exam, creating (or starting) it if needed"""
+    submission = db.query(Submission).filter(
+        Submission.exam_id == exam_id,
+        Submission.student_id == student.id,
+        Submission.submitted_at.is_(None)  # Only get in-progress submissions
+    ).order_by(Submission.started_at.desc()).first()
+    
+    if not submission:
+        # Create new in-progress submission (submitted_at should be None, not set)
+        submission = Submission(
+            exam_id=exam_id,
+            student_id=student.id,
+            started_at=datetime.utcnow(),
+            submitted_at=None  # In-progress, not submitted yet
+        )
+        db.add(submission)
+        db.flush()  # Flush to get the ID
+        logger.debug("Created new submission %s for exam %s, student %s", submission.id, exam_id, student.id)
+    else:
+        # If submission exists but hasn't been started yet, set started_at now
+        # (written by the caller's commit)
+        if submission.started_at is None:
+            submission.started_at = datetime.utcnow()
+        logger.debug("Using existing submission %s for exam %s, student %s", submission.id, exam_id, student.id)
+    return submission
+
+
+def upsert_answer(db: Session, submission_id: int, question_id: int, **values) -> int:
+    """Insert or overwrite the answer for (submission, question) in one statement, returning its id
+    
+    Relies on the unique (submission_id, question_id) index, so concurrent double submits
+    can't create duplicate answers.
+    """
+    stmt = sqlite_insert(Answer).values(
+        submission_id=submission_id,
+        question_id=question_id,
+        **values
+    ).on_conflict_do_update(
+        index_elements=["submission_id", "question_id"],
+        set_=values
+    ).returning(Answer.id)
+    return db.execute(stmt).scalar_one()
+
+
+def mark_submitted_if_complete(db: Session, submission: Submission, exam_id: int):
+    """Mark the submission as submitted once every question of the exam has an answer
+    
+    The completeness check and the update are one UPDATE statement, so it sees answers
+    written in the same transaction and can't race with concurrent submits.
+    Only updates the session; the caller commits.
+    """
+    if submission.submitted_at is not None:
+        return
+    
+    answered_count = select(func.count(Answer.id)).where(Answer.submission_id == submission.id).scalar_subquery()
+    # exams.question_count is kept in sync by triggers, so no COUNT over questions is needed
+    question_count = select(Exam.question_count).where(Exam.id == exam_id).scalar_subquery()
+    marked = db.query(Submission).filter(
+        Submission.id == submission.id,
+        Submission.submitted_at.is_(None),
+        answered_count >= question_count
+    ).update({Submission.submitted_at: datetime.utcnow()}, synchronize_session="fetch")
+    
+    if marked:
+        logger.debug("All questions answered, marking submission %s as submitted", submission.id)
+
+
+def load_grading_context(db: Session, exam_id: int, question_id: int) -> Tuple[Exam, Question, Rubric]:
+    """Load exam, question and rubric in one query, raising 404/500 for whichever is missing"""
+    # Question/rubric are outer joined so the specific missing piece can still be reported
+    row = db.query(Exam, Question, Rubric).outerjoin(
+        Question, and_(Question.exam_id == Exam.id, Question.id == question_id)
+    ).outerjoin(
+        Rubric, Rubric.question_id == Question.id
+    ).filter(Exam.id == exam_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    exam, question, rubric = row
+    
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    if not rubric:
+        raise HTTPException(status_code=500, detail="Rubric not found for question")
+    return exam, question, rubric
+
+
+def store_graded_answer(
+    db: Session,
+    exam_id: int,
+    question_id: int,
+    student: Student,
+    response_text: str,
+    grade_data: Dict[str, Any]
+) -> Tuple[int, int]:
+    """Save a graded answer (and submission completion) in one transaction, returning (submission_id, answer_id)"""
+    # Create or get in-progress submission (submitted_at IS NULL)
+    submission = get_or_create_in_progress_submission(db, exam_id, student)
+    
+    # Insert the answer, or overwrite it if this question was already answered
+    # (one-to-one: only one answer per question per submission)
+    answer_id = upsert_answer(
+        db,
+        submission.id,
+        question_id,
+        student_answer=response_text,
+        llm_score=float(grade_data.get("total_score", 0.0)),
+        llm_feedback=grade_data.get("feedback", ""),
+        grade_json=orjson.dumps(grade_data).decode(),
+        graded_at=datetime.utcnow(),
+        grading_model_name=TOGETHER_AI_MODEL,
+        grading_temperature=0.7,
+        grading_attempts=0,
+        grading_failed_at=None
+    )
+    
+    # Check if all questions for this exam have been answered
+    # If so, mark the submission as submitted
+    mark_submitted_if_complete(db, submission, exam_id)
+    
+    submission_id, submitted_at = submission.id, submission.submitted_at
+    db.commit()
+    logger.debug("Committed answer for submission %s, submitted_at=%s", submission_id, submitted_at)
+    return submission_id, answer_id
+
+
+def grade_result_payload(question_id: int, grade_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Grade result returned to the student for one question"""
+    return {
+        "question_id": str(question_id),
+        "scores": grade_data.get("scores", {}),
+        "total_score": grade_data.get("total_score", 0.0),
+        "explanation": grade_data.get("explanation", ""),
+        "feedback": grade_data.get("feedback", ""),
+        "rubric_breakdown": grade_data.get("rubric_breakdown", []),
+        "annotations": grade_data.get("annotations", [])
+    }
+
+
 @router.post("/api/submit-response", tags=["responses"])
 async def submit_response(
     response: StudentResponse, 
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_auth)
+    student: Student = Depends(get_current_student)
 ):
     """Submit student response and get graded result, store in database"""
     try:
-        # Get exam and question
-        try:
-            exam_id_int = int(response.exam_id)
-            question_id_int = int(response.question_id)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid exam_id or question_id format")
-        
-        exam = db.query(Exam).filter(Exam.id == exam_id_int).first()
-        if not exam:
-            raise HTTPException(status_code=404, detail="Exam not found")
-        
-        question = db.query(Question).filter(
-            Question.id == question_id_int,
-            Question.exam_id == exam_id_int
-        ).first()
-        if not question:
-            raise HTTPException(status_code=404, detail="Question not found")
-
-        rubric = db.query(Rubric).filter(Rubric.question_id == question.id).first()
-        if not rubric:
-            raise HTTPException(status_code=500, detail="Rubric not found for question")
-        
-        # Parse rubric
-        try:
-            rubric_data = json.loads(rubric.rubric_text)
-        except:
-            rubric_data = {"text": rubric.rubric_text}
+        # Database work runs in the threadpool so it doesn't block the event loop
+        exam, question, rubric = await run_in_threadpool(load_grading_context, db, response.exam_id, response.question_id)
         
         # Prepare grading prompt
-        rubric_str = json.dumps(rubric_data, indent=2)
-        prompt = GRADING_TEMPLATE.format(
-            question_text=question.prompt,
-            grading_rubric=rubric_str,
-            background_info=question.background_info or "",
-            domain_info=exam.domain or "",
-            student_response=response.response_text,
-            time_spent=response.time_spent_seconds or 0
+        prompt = build_grading_prompt(
+            question.prompt,
+            rubric_prompt_text(rubric),
+            question.background_info,
+            exam.domain,
+            response.response_text,
+            response.time_spent_seconds
         )
 
         # Call LLM for grading
-        llm_response = await call_together_ai(
-            prompt,
-            system_prompt="You are an expert educator. Always return valid JSON with accurate scores."
-        )
+        llm_response = await call_together_ai(prompt, system_prompt=GRADING_SYSTEM_PROMPT)
 
         # Parse grading result
         grade_data = extract_json_from_response(llm_response)
 
-        # Get student from authenticated user
-        if current_user.user_type == "student" and current_user.student_id:
-            # User is linked to a student record
-            student = db.query(Student).filter(Student.id == current_user.student_id).first()
-            if not student:
-                raise HTTPException(status_code=404, detail="Student record not found for user")
-        else:
-            # Create or get student using username as student_id
-            student_id_str = current_user.username
-            student = get_or_create_student(db, student_id_str, name=current_user.username)
-        
-        # Create or get in-progress submission (submitted_at IS NULL)
-        submission = db.query(Submission).filter(
-            Submission.exam_id == exam_id_int,
-            Submission.student_id == student.id,
-            Submission.submitted_at.is_(None)  # Only get in-progress submissions
-        ).order_by(Submission.started_at.desc()).first()
-        
-        if not submission:
-            # Create new in-progress submission (submitted_at should be None, not set)
-            submission = Submission(
-                exam_id=exam_id_int,
-                student_id=student.id,
-                started_at=datetime.utcnow(),
-                submitted_at=None  # In-progress, not submitted yet
-            )
-            db.add(submission)
-            db.flush()  # Flush to get the ID
-            print(f"DEBUG: Created new submission {submission.id} for exam {exam_id_int}, student {student.id}")
-        else:
-            # If submission exists but hasn't been started yet, set started_at now
-            if submission.started_at is None:
-                submission.started_at = datetime.utcnow()
-                db.flush()
-            print(f"DEBUG: Using existing submission {submission.id} for exam {exam_id_int}, student {student.id}")
-        
-        # Check if answer already exists for this submission+question (one-to-one constraint)
-        existing_answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == question_id_int
-        ).first()
-        
-        if existing_answer:
-            # Update existing answer (one-to-one: only one answer per question per submission)
-            existing_answer.student_answer = response.response_text
-            existing_answer.llm_score = float(grade_data.get("total_score", 0.0))
-            existing_answer.llm_feedback = grade_data.get("feedback", "")
-            existing_answer.graded_at = datetime.utcnow()
-            existing_answer.grading_model_name = TOGETHER_AI_MODEL
-            existing_answer.grading_temperature = 0.7
-            answer = existing_answer
-        else:
-            # Create new answer record (one-to-one mapping: question_id -> answer)
-            answer = Answer(
-                submission_id=submission.id,
-                question_id=question_id_int,  # Ensures exact one-to-one mapping
-                student_answer=response.response_text,
-                llm_score=float(grade_data.get("total_score", 0.0)),
-                llm_feedback=grade_data.get("feedback", ""),
-                graded_at=datetime.utcnow(),
-                grading_model_name=TOGETHER_AI_MODEL,
-                grading_temperature=0.7
-            )
-            db.add(answer)
-        
-        db.commit()
-        db.refresh(answer)
-        
-        # Refresh submission to get latest state before checking completion
-        db.refresh(submission)
-        print(f"DEBUG: Committed answer for submission {submission.id}, submitted_at={submission.submitted_at}")
-        
-        # Force SQLite checkpoint to ensure submission is immediately visible to other queries
-        try:
-            from sqlalchemy import text
-            db.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
-            db.commit()
-        except Exception as e:
-            print(f"DEBUG: Checkpoint warning in submit_response (non-critical): {e}")
-        
-        # Check if all questions for this exam have been answered
-        # If so, mark the submission as submitted
-        all_questions = db.query(Question).filter(Question.exam_id == exam_id_int).all()
-        answered_questions = db.query(Answer).filter(Answer.submission_id == submission.id).all()
-        
-        # Mark submission as submitted if all questions have been answered
-        if len(answered_questions) >= len(all_questions) and submission.submitted_at is None:
-            submission.submitted_at = datetime.utcnow()
-            db.commit()
-            db.refresh(submission)
-            # Force SQLite checkpoint to ensure change is immediately visible
-            try:
-                from sqlalchemy import text
-                db.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
-                db.commit()
-            except Exception as e:
-                print(f"DEBUG: Checkpoint warning (non-critical): {e}")
-            print(f"DEBUG: All questions answered, marking submission {submission.id} as submitted")
+        # Submission, answer and completion are written in one transaction
+        submission_id, answer_id = await run_in_threadpool(
+            store_graded_answer, db, response.exam_id, response.question_id, student, response.response_text, grade_data
+        )
         
         # Create grade result response
-        grade_result = {
-            "question_id": response.question_id,
-            "scores": grade_data.get("scores", {}),
-            "total_score": grade_data.get("total_score", 0.0),
-            "explanation": grade_data.get("explanation", ""),
-            "feedback": grade_data.get("feedback", ""),
-            "rubric_breakdown": grade_data.get("rubric_breakdown", []),
-            "annotations": grade_data.get("annotations", [])
-        }
+        grade_result = grade_result_payload(response.question_id, grade_data)
 
-        print(f"DEBUG: Successfully stored answer {answer.id} for submission {submission.id}")
+        logger.debug("Successfully stored answer %s for submission %s", answer_id, submission_id)
         return grade_result
 
     except HTTPException as e:
@@ -2015,15 +2174,243 @@ async def submit_response(
         raise e
     except Exception as e:
         db.rollback()
-        print(f"DEBUG: Unexpected error in submit_response: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error in submit_response: %s: %s", type(e).__name__, e)
         raise HTTPException(
             status_code=500,
             detail="An unexpected error occurred while grading your response. Please try again."
         )
 
 
+def _sse_event(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event frame"""
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"event: " + event.encode() + b"\n" + frame if event else frame
+
+
+@router.post("/api/submit-response/stream", tags=["responses"])
+async def submit_response_stream(
+    response: StudentResponse,
+    db: Session = Depends(get_db),
+    student: Student = Depends(get_current_student)
+):
+    """Submit a student response and stream the grading as server-sent events
+    
+    Emits "data: {"token": ...}" frames while the LLM generates, then a single
+    "result" event with the same payload as /api/submit-response (or an "error" event).
+    """
+    exam, question, rubric = await run_in_threadpool(load_grading_context, db, response.exam_id, response.question_id)
+    prompt = build_grading_prompt(
+        question.prompt,
+        rubric_prompt_text(rubric),
+        question.background_info,
+        exam.domain,
+        response.response_text,
+        response.time_spent_seconds
+    )
+    
+    async def events() -> AsyncIterator[bytes]:
+        chunks = []
+        try:
+            async for chunk in stream_together_ai(prompt, system_prompt=GRADING_SYSTEM_PROMPT):
+                chunks.append(chunk)
+                yield _sse_event({"token": chunk})
+            
+            grade_data = extract_json_from_response("".join(chunks))
+            # The request session may already be closed while streaming, so store with a fresh one
+            await run_in_session(lambda session: store_graded_answer(
+                session, response.exam_id, response.question_id, student, response.response_text, grade_data
+            ))
+            yield _sse_event(grade_result_payload(response.question_id, grade_data), event="result")
+        except HTTPException as e:
+            yield _sse_event({"detail": e.detail}, event="error")
+        except Exception as e:
+            logger.exception("Unexpected error in submit_response_stream: %s: %s", type(e).__name__, e)
+            yield _sse_event(
+                {"detail": "An unexpected error occurred while grading your response. Please try again."},
+                event="error"
+            )
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# Deferred (batched) grading: answers are stored ungraded (graded_at IS NULL) and a
+# background worker grades them in batches, so the database itself is the queue.
+# Answers whose grading fails MAX_GRADING_ATTEMPTS times are marked failed and leave the queue.
+GRADING_BATCH_SIZE = 20
+GRADING_BATCH_INTERVAL_SECONDS = 5.0
+MAX_GRADING_ATTEMPTS = 3
+_grading_wakeup = asyncio.Event()
+_deferred_since_last_batch = 0
+
+
+@router.post("/api/submit-response/deferred", tags=["responses"], status_code=202)
+async def submit_response_deferred(
+    response: StudentResponse,
+    db: Session = Depends(get_db),
+    student: Student = Depends(get_current_student)
+):
+    """Store a student response for batched grading and return immediately
+    
+    Poll GET /api/response/{exam_id}/{question_id} until grading_status is "graded" (or "failed").
+    """
+    global _deferred_since_last_batch
+    try:
+        question = db.query(Question).filter(
+            Question.id == response.question_id,
+            Question.exam_id == response.exam_id
+        ).first()
+        if not question:
+            raise HTTPException(status_code=404, detail="Question not found")
+        
+        submission = get_or_create_in_progress_submission(db, response.exam_id, student)
+        
+        # Store the answer ungraded (one answer per question per submission)
+        answer_id = upsert_answer(
+            db,
+            submission.id,
+            response.question_id,
+            student_answer=response.response_text,
+            llm_score=None,
+            llm_feedback=None,
+            grade_json=None,
+            graded_at=None,
+            grading_attempts=0,
+            grading_failed_at=None
+        )
+        mark_submitted_if_complete(db, submission, response.exam_id)
+        db.commit()
+        
+        # Wake the grading worker early once a full batch is waiting
+        _deferred_since_last_batch += 1
+        if _deferred_since_last_batch >= GRADING_BATCH_SIZE:
+            _grading_wakeup.set()
+        
+        return {
+            "question_id": str(response.question_id),
+            "answer_id": str(answer_id),
+            "submission_id": str(submission.id),
+            "grading_status": "pending"
+        }
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.exception("Unexpected error in submit_response_deferred: %s: %s", type(e).__name__, e)
+        raise HTTPException(status_code=500, detail="An unexpected error occurred while saving your response. Please try again.")
+
+
+async def grade_pending_answers(limit: int = GRADING_BATCH_SIZE) -> int:
+    """Grade one batch of ungraded answers concurrently and store the grades in one transaction
+    
+    Returns the number of answers that were graded. Answers whose grading failed stay
+    ungraded and are retried with later batches (after answers with fewer failed attempts)
+    until they reach MAX_GRADING_ATTEMPTS, at which point they are marked failed.
+    """
+    pending = await run_in_session(lambda session: session.query(
+        Answer.id,
+        Answer.submission_id,
+        Answer.student_answer,
+        Question.prompt,
+        Question.background_info,
+        Rubric.rubric_text,
+        Exam.domain,
+    ).join(
+        Question, Question.id == Answer.question_id
+    ).join(
+        Exam, Exam.id == Question.exam_id
+    ).outerjoin(
+        Rubric, Rubric.question_id == Question.id
+    ).filter(
+        Answer.graded_at.is_(None),
+        Answer.grading_failed_at.is_(None)
+    ).order_by(Answer.grading_attempts, Answer.id).limit(limit).all())
+    if not pending:
+        return 0
+    
+    llm_responses = await asyncio.gather(*[
+        call_together_ai(
+            build_grading_prompt(
+                row.prompt,
+                _format_rubric_text(row.rubric_text),
+                row.background_info,
+                row.domain,
+                row.student_answer,
+                None  # Time spent is not stored with the answer
+            ),
+            system_prompt=GRADING_SYSTEM_PROMPT
+        )
+        for row in pending
+    ], return_exceptions=True)
+    
+    def record_failure(db: Session, row):
+        # Count the failed attempt and give up on the answer once it hits the limit
+        db.query(Answer).filter(
+            Answer.id == row.id,
+            Answer.graded_at.is_(None),
+            Answer.student_answer == row.student_answer
+        ).update({
+            Answer.grading_attempts: Answer.grading_attempts + 1,
+            Answer.grading_failed_at: case(
+                (Answer.grading_attempts + 1 >= MAX_GRADING_ATTEMPTS, datetime.utcnow()),
+                else_=None
+            ),
+        }, synchronize_session=False)
+    
+    def store_grades(db: Session) -> int:
+        graded = 0
+        for row, llm_response in zip(pending, llm_responses):
+            if isinstance(llm_response, BaseException):
+                logger.error("Deferred grading failed for answer %s", row.id, exc_info=llm_response)
+                record_failure(db, row)
+                continue
+            try:
+                grade_data = extract_json_from_response(llm_response)
+            except Exception:
+                logger.exception("Failed to parse deferred grade for answer %s", row.id)
+                record_failure(db, row)
+                continue
+            # Only fill answers that are still ungraded (the student may have resubmitted meanwhile)
+            graded += db.query(Answer).filter(
+                Answer.id == row.id,
+                Answer.graded_at.is_(None),
+                Answer.student_answer == row.student_answer
+            ).update({
+                Answer.llm_score: float(grade_data.get("total_score", 0.0)),
+                Answer.llm_feedback: grade_data.get("feedback", ""),
+                Answer.grade_json: orjson.dumps(grade_data).decode(),
+                Answer.graded_at: datetime.utcnow(),
+                Answer.grading_model_name: TOGETHER_AI_MODEL,
+                Answer.grading_temperature: 0.7,
+            }, synchronize_session=False)
+        db.commit()
+        return graded
+    
+    graded = await run_in_session(store_grades)
+    for submission_id in {row.submission_id for row in pending}:
+        invalidate_submission_results(submission_id)
+    logger.debug("Batch graded %d/%d deferred answers", graded, len(pending))
+    return graded
+
+
+async def run_grading_worker():
+    """Background task that grades deferred responses every few seconds (or once a batch is full)"""
+    global _deferred_since_last_batch
+    while True:
+        try:
+            await asyncio.wait_for(_grading_wakeup.wait(), timeout=GRADING_BATCH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _grading_wakeup.clear()
+        _deferred_since_last_batch = 0
+        try:
+            # Keep draining while full batches are being graded
+            while await grade_pending_answers() == GRADING_BATCH_SIZE:
+                pass
+        except Exception as e:
+            logger.exception("Unexpected error in grading worker: %s: %s", type(e).__name__, e)
+
+
 @router.get("/api/response/{exam_id}/{question_id}", tags=["responses"])
 async def get_response(exam_id: str, question_id: str, student_id: str = None, db: Session = Depends(get_db)):
     """Get stored student response and grade from database with exact question-answer mapping"""
@@ -2059,13 +2446,9 @@ async def get_response(exam_id: str, question_id: str, student_id: str = None, d
         raise HTTPException(status_code=404, detail="Response not found")
     
     # Get question details for complete mapping
-    rubric = db.query(Rubric).filter(Rubric.question_id == question.id).first()
-    rubric_data = {}
-    if rubric:
-        try:
-            rubric_data = json.loads(rubric.rubric_text)
-        except:
-            rubric_data = {"text": rubric.rubric_text}
+    rubric = db.scalars(RUBRIC_FOR_QUESTION, {"question_id": question.id}).first()
+    rubric_data = parse_rubric(rubric)
+    grade_data = orjson.loads(answer.grade_json) if answer.grade_json else {}
     
     return {
         "exam_id": exam_id,
@@ -2083,13 +2466,18 @@ async def get_response(exam_id: str, question_id: str, student_id: str = None, d
             "time_spent_seconds": None,  # Not stored currently
             "grade": {
                 "question_id": question_id,
-                "scores": {},  # Could parse from feedback if needed
+                "scores": grade_data.get("scores", {}),
                 "total_score": float(answer.llm_score) if answer.llm_score else 0.0,
-                "explanation": "",
+                "explanation": grade_data.get("explanation", ""),
                 "feedback": answer.llm_feedback or ""
             },
-            "submitted_at": answer.graded_at.isoformat() if answer.graded_at else None,
-            "grading_model_name": answer.grading_model_name
+            "submitted_at": _iso(answer.graded_at),
+            "grading_model_name": answer.grading_model_name,
+            "grading_status": (
+                "graded" if answer.graded_at is not None
+                else "failed" if answer.grading_failed_at is not None
+                else "pending"
+            )
         }
     }
 
@@ -2107,87 +2495,118 @@ async def get_all_classes(
     if current_user.user_type != "instructor":
         raise HTTPException(status_code=403, detail="Only instructors can access this endpoint")
     
-    # Get all unique class names from students (excluding None/empty)
-    classes = db.query(Student.class_name).filter(
-        Student.class_name.isnot(None),
-        Student.class_name != ""
-    ).distinct().all()
-    
-    class_names = [c[0] for c in classes if c[0]]
-    class_names.sort()
+    class_names = _classes_cache.get("classes")
+    if class_names is None:
+        # Get all unique class names from students (excluding None/empty)
+        classes = db.query(Student.class_name).filter(
+            Student.class_name.isnot(None),
+            Student.class_name != ""
+        ).distinct().all()
+        
+        class_names = [c[0] for c in classes if c[0]]
+        class_names.sort()
+        _classes_cache.set("classes", class_names)
     
     return {"classes": class_names}
 
 
+STUDENTS_PAGE_MAX_SIZE = 200
+
+
+def encode_students_cursor(row) -> str:
+    """Opaque pagination cursor for get_all_students, encoding a row's (name, id)"""
+    return base64.urlsafe_b64encode(orjson.dumps([row.name, row.id])).decode()
+
+
+def decode_students_cursor(cursor: str) -> Tuple[str, int]:
+    """Decode a cursor produced by encode_students_cursor"""
+    try:
+        name, student_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(name), int(student_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/api/instructor/students", tags=["instructor"])
 async def get_all_students(
     class_name: str = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     current_user: User = Depends(require_auth),
     db: Session = Depends(get_db)
 ):
-    """Get all students in the system (instructor only) - excludes instructor/admin accounts. Optionally filter by class."""
+    """Get all students in the system (instructor only) - excludes instructor/admin accounts. Optionally filter by class.
+    
+    Pass limit (at most STUDENTS_PAGE_MAX_SIZE) to get one page ordered by (name, id) plus a
+    next_cursor to pass back as cursor for the following page (null on the last page).
+    Without limit the whole roster is returned, as before.
+    """
     if current_user.user_type != "instructor":
         raise HTTPException(status_code=403, detail="Only instructors can access this endpoint")
     
-    # Get all students, but exclude those that are linked to instructor user accounts
-    query = db.query(Student)
+    # Get all students, but exclude (in SQL) those that are:
+    # 1. Linked to instructor accounts via foreign key (student_id)
+    # 2. Have a student_id string that matches an instructor username
+    query = db.query(Student).filter(~exists().where(
+        User.user_type == "instructor",
+        (User.student_id == Student.id) | (func.lower(User.username) == func.lower(Student.student_id))
+    ))
     
     # Filter by class if provided
     if class_name:
         query = query.filter(Student.class_name == class_name)
     
-    all_students = query.order_by(Student.name).all()
-    
-    # Get all user accounts that are instructors to exclude their student records
-    instructor_users = db.query(User).filter(User.user_type == "instructor").all()
-    
-    # Create sets of IDs/usernames to exclude
-    instructor_student_ids = {user.student_id for user in instructor_users if user.student_id}
-    instructor_usernames = {user.username.lower() for user in instructor_users}
-    
-    # Filter out students that are:
-    # 1. Linked to instructor accounts via foreign key (student_id)
-    # 2. Have a student_id string that matches an instructor username
-    students = [
-        s for s in all_students 
-        if s.id not in instructor_student_ids 
-        and s.student_id.lower() not in instructor_usernames
-    ]
+    # Only the listed columns are needed, so fetch plain rows instead of Student instances
+    query = query.with_entities(
+        Student.id,
+        Student.student_id,
+        Student.name,
+        Student.email,
+        Student.class_name,
+        Student.created_at,
+        Student.assigned_exams_count,
+        Student.pending_disputes_count
+    )
     
-    # Get assignment counts and dispute counts for each student
-    # Only count submissions for assigned exams (where exam.student_id is NULL, meaning instructor-created)
-    students_data = []
-    for student in students:
-        # Count submissions for assigned exams only (exclude practice exams)
-        # Practice exams have exam.student_id set, assigned exams have exam.student_id = NULL
-        submissions = db.query(Submission).join(Exam).filter(
-            Submission.student_id == student.id,
-            Exam.student_id.is_(None)  # Only count assigned exams, not practice exams
-        ).all()
-        
-        submission_count = len(submissions)
-        
-        # Count pending disputes for this student
-        submission_ids = [s.id for s in submissions]
-        pending_disputes_count = 0
-        if submission_ids:
-            pending_disputes_count = db.query(AssignedExamDispute).filter(
-                AssignedExamDispute.submission_id.in_(submission_ids),
-                AssignedExamDispute.status == "pending"
-            ).count()
-        
-        students_data.append({
+    if limit is None:
+        students = query.order_by(Student.name).all()
+    else:
+        if not 1 <= limit <= STUDENTS_PAGE_MAX_SIZE:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {STUDENTS_PAGE_MAX_SIZE}")
+        # Keyset pagination on (name, id): the cursor is the last row of the previous page
+        if cursor:
+            cursor_name, cursor_id = decode_students_cursor(cursor)
+            query = query.filter(tuple_(Student.name, Student.id) > (cursor_name, cursor_id))
+        students = query.order_by(Student.name, Student.id).limit(limit + 1).all()
+    
+    # Assignment and pending dispute counts come from the denormalized columns on students
+    # (kept in sync by triggers, see STUDENT_STATS_TRIGGERS), so no per-request aggregation is needed
+    # Only assigned exams are counted (exam.student_id is NULL, meaning instructor-created)
+    
+    students_data = [
+        {
             "id": student.id,
             "student_id": student.student_id,
             "name": student.name,
             "email": student.email,
             "class_name": student.class_name,
-            "created_at": student.created_at.isoformat() if student.created_at else None,
-            "assigned_exams_count": submission_count,
-            "pending_disputes_count": pending_disputes_count
-        })
+            "created_at": student.created_at,
+            "assigned_exams_count": student.assigned_exams_count,
+            "pending_disputes_count": student.pending_disputes_count
+        }
+        for student in students
+    ]
     
-    return {"students": students_data}
+    if limit is not None:
+        # The extra row fetched above only tells whether another page exists
+        has_more = len(students_data) > limit
+        students_data = students_data[:limit]
+        next_cursor = encode_students_cursor(students[limit - 1]) if has_more else None
+        return ORJSONResponse({"students": students_data, "next_cursor": next_cursor})
+    
+    # Returned as ORJSONResponse directly: orjson serializes the roster (datetimes included,
+    # in the same ISO 8601 format) without FastAPI's jsonable_encoder pass over every row
+    return ORJSONResponse({"students": students_data})
 
 
 @router.get("/api/instructor/students/{student_id}", tags=["instructor"])
@@ -2205,66 +2624,68 @@ async def get_student_details(
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Get all assigned exam submissions for this student (only instructor-created exams)
-    submissions = db.query(Submission).join(Exam).filter(
+    # Get all assigned exam submissions for this student together with their exams (only instructor-created exams)
+    rows = db.query(Submission, Exam).join(Exam).filter(
         Submission.student_id == student.id,
         Exam.student_id.is_(None)  # Only assigned exams, not practice exams
     ).order_by(Submission.started_at.desc()).all()
+    submission_ids = [submission.id for submission, _ in rows]
+    
+    # Sum answer scores and question points per submission in SQL (one grouped query),
+    # and load the submissions that have a pending dispute in another
+    score_totals = {}
+    pending_dispute_submission_ids = set()
+    if submission_ids:
+        # Use instructor score if edited, otherwise use LLM score
+        scores_stmt = select(
+            Answer.submission_id,
+            func.coalesce(func.sum(FINAL_ANSWER_SCORE), 0.0).label("total_score"),
+            # Max points from the answers' questions
+            func.coalesce(func.sum(Question.points_possible), 0.0).label("max_score")
+        ).outerjoin(
+            Question, Question.id == Answer.question_id
+        ).where(Answer.submission_id.in_(submission_ids)).group_by(Answer.submission_id)
+        pending_stmt = select(AssignedExamDispute.submission_id).where(
+            AssignedExamDispute.submission_id.in_(submission_ids),
+            AssignedExamDispute.status == "pending"
+        ).distinct()
+        
+        # The two queries are independent, so run them concurrently on their own sessions
+        score_rows, pending_rows = await asyncio.gather(
+            run_in_session(lambda session: session.execute(scores_stmt).all()),
+            run_in_session(lambda session: session.execute(pending_stmt).all()),
+        )
+        score_totals = {row.submission_id: row for row in score_rows}
+        pending_dispute_submission_ids = {submission_id for (submission_id,) in pending_rows}
     
     # Get exam details with scores
     exam_details = []
-    for submission in submissions:
-        exam = db.query(Exam).filter(Exam.id == submission.exam_id).first()
-        if not exam:
-            continue
-        
-        # Get all answers for this submission
-        answers = db.query(Answer).filter(Answer.submission_id == submission.id).all()
-        has_answers = len(answers) > 0
-        
-        # Calculate total score (use instructor score if edited, otherwise use LLM score)
-        total_score = 0.0
-        max_score = 0.0
-        for answer in answers:
-            # Use instructor score if edited, otherwise use LLM score
-            final_score = float(answer.instructor_score) if answer.instructor_edited and answer.instructor_score is not None else (float(answer.llm_score) if answer.llm_score is not None else 0.0)
-            total_score += final_score
-            
-            # Get max points from question
-            question = db.query(Question).filter(Question.id == answer.question_id).first()
-            if question:
-                max_score += float(question.points_possible)
+    for submission, exam in rows:
+        totals = score_totals.get(submission.id)
+        has_answers = totals is not None
+        total_score = float(totals.total_score) if totals else 0.0
+        max_score = float(totals.max_score) if totals else 0.0
         
         percentage = round((total_score / max_score * 100), 2) if max_score > 0 else 0.0
         
-        # Get question count
-        question_count = db.query(Question).filter(Question.exam_id == exam.id).count()
-        
-        # Get dispute information for this submission
-        dispute = db.query(AssignedExamDispute).filter(
-            AssignedExamDispute.submission_id == submission.id,
-            AssignedExamDispute.status == "pending"
-        ).first()
-        
-        has_pending_dispute = dispute is not None
-        
         exam_details.append({
             "exam_id": exam.id,
             "exam_title": exam.title or f"{exam.domain} Exam",
             "domain": exam.domain,
-            "question_count": question_count,
-            "started_at": submission.started_at.isoformat() if submission.started_at else None,
-            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+            "question_count": exam.question_count,
+            "started_at": submission.started_at,
+            "submitted_at": submission.submitted_at,
             "total_score": round(total_score, 2),
             "max_score": round(max_score, 2),
             "percentage": percentage,
             "is_completed": submission.submitted_at is not None,
             "is_in_progress": submission.submitted_at is None and submission.started_at is not None and has_answers,
-            "has_pending_dispute": has_pending_dispute
+            "has_pending_dispute": submission.id in pending_dispute_submission_ids
         })
     
     # FERPA compliant: Only return educational information
-    return {
+    # (returned as ORJSONResponse directly, skipping jsonable_encoder; see get_all_students)
+    return ORJSONResponse({
         "student": {
             "id": student.id,
             "student_id": student.student_id,
@@ -2276,7 +2697,7 @@ async def get_student_details(
         "total_exams_assigned": len(exam_details),
         "completed_exams": len([e for e in exam_details if e["is_completed"]]),
         "in_progress_exams": len([e for e in exam_details if e["is_in_progress"]])
-    }
+    })
 
 
 @router.get("/api/instructor/exam/{exam_id}/review", tags=["instructor"])
@@ -2311,18 +2732,12 @@ async def review_exam(
         raise HTTPException(status_code=400, detail="Cannot review practice exams. Only instructor-created exams can be reviewed.")
     
     # Load questions with rubrics, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    questions = db.scalars(QUESTIONS_FOR_EXAM, {"exam_id": exam.id}).all()
+    rubrics_by_question = load_rubrics_by_question(db, [q.id for q in questions])
     
     questions_list = []
     for q in questions:
-        # Get rubric for question
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-        rubric_data = {}
-        if rubric:
-            try:
-                rubric_data = json.loads(rubric.rubric_text)
-            except:
-                rubric_data = {"text": rubric.rubric_text}
+        rubric_data = parse_rubric(rubrics_by_question.get(q.id))
         
         questions_list.append({
             "question_id": str(q.id),
@@ -2342,7 +2757,7 @@ async def review_exam(
         "domain": exam.domain,
         "title": exam.title,
         "instructions_to_llm": exam.instructions_to_llm,
-        "created_at": exam.created_at.isoformat() if exam.created_at else None,
+        "created_at": _iso(exam.created_at),
         "questions_count": len(questions_list),
         "submissions_count": submissions_count,
         "questions": questions_list
@@ -2360,11 +2775,10 @@ async def get_instructor_exams(
     
     # Get or create instructor record
     instructor = get_or_create_instructor_for_user(db, current_user)
-    print(f"DEBUG: get_instructor_exams - user.username={current_user.username}, instructor.id={instructor.id}, user.instructor_id={current_user.instructor_id}", flush=True)
+    logger.debug("get_instructor_exams - user=%s, instructor_id=%s", current_user.username, instructor.id)
     
     # Get default instructor
-    default_instructor = db.query(Instructor).filter(Instructor.email == "default@system.edu").first()
-    default_instructor_id = default_instructor.id if default_instructor else None
+    default_instructor_id = get_default_instructor_id(db)
     
     # CRITICAL: Only show exams created by the logged-in instructor's own instructor record
     # AND exclude all default instructor exams (those are student practice exams)
@@ -2375,37 +2789,41 @@ async def get_instructor_exams(
         # This instructor is the default instructor - don't show any exams
         # because all default instructor exams are student practice exams
         exams = []
-        print(f"DEBUG: Instructor is default instructor, returning empty list", flush=True)
     else:
         # This is a real instructor - only show their own exams that are assigned (student_id = NULL)
-        exams = db.query(Exam).filter(
+        # (plain rows with just the listed columns, not Exam instances; the column
+        # labels are the response keys, so each row maps straight onto its payload)
+        exams = db.query(
+            Exam.id,
+            Exam.title,
+            Exam.domain,
+            Exam.instructions_to_llm,
+            Exam.created_at,
+            Exam.question_count.label("questions_count")
+        ).filter(
             Exam.instructor_id == instructor.id,
             Exam.student_id.is_(None),  # Only assigned exams, not practice
             Exam.instructor_id != default_instructor_id  # Double-check: exclude default instructor
         ).order_by(Exam.created_at.desc()).all()
-        print(f"DEBUG: Found {len(exams)} exams for instructor_id={instructor.id}", flush=True)
-        for exam in exams:
-            print(f"DEBUG:   - Exam ID={exam.id}, title={exam.title}, instructor_id={exam.instructor_id}, student_id={exam.student_id}", flush=True)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Found exams %s for instructor_id=%s", [exam.id for exam in exams], instructor.id)
+    
+    # Count submissions for all exams in one grouped query
+    # (question counts come from the trigger-maintained exams.question_count)
+    exam_ids = [exam.id for exam in exams]
+    submission_counts = dict(db.query(
+        Submission.exam_id, func.count(Submission.id)
+    ).filter(
+        Submission.exam_id.in_(exam_ids)
+    ).group_by(Submission.exam_id).all()) if exam_ids else {}
     
-    exams_data = []
-    for exam in exams:
-        # Count questions for this exam
-        questions_count = db.query(Question).filter(Question.exam_id == exam.id).count()
-        
-        # Count submissions for this exam
-        submissions_count = db.query(Submission).filter(Submission.exam_id == exam.id).count()
-        
-        exams_data.append({
-            "id": exam.id,
-            "title": exam.title,
-            "domain": exam.domain,
-            "instructions_to_llm": exam.instructions_to_llm,
-            "created_at": exam.created_at.isoformat() if exam.created_at else None,
-            "questions_count": questions_count,
-            "submissions_count": submissions_count
-        })
+    exams_data = [
+        dict(exam._mapping, submissions_count=submission_counts.get(exam.id, 0))
+        for exam in exams
+    ]
     
-    return {"exams": exams_data}
+    # Returned as ORJSONResponse directly, skipping jsonable_encoder (see get_all_students)
+    return ORJSONResponse({"exams": exams_data})
 
 
 class CreateExamRequest(BaseModel):
@@ -2508,20 +2926,16 @@ async def edit_exam(
         if exam.student_id is not None:
             raise HTTPException(status_code=400, detail="Cannot edit practice exams. Only instructor-created exams can be edited.")
         
-        print(f"DEBUG: [START] Edit exam {exam_id_int} - Domain: {request.domain}, Questions: {request.number_of_questions}", flush=True)
+        logger.debug("Edit exam %s started - domain: %s, questions: %s", exam_id_int, request.domain, request.number_of_questions)
         
-        # Step 1: Delete all existing questions and rubrics (cascade will handle related data)
-        existing_questions = db.query(Question).filter(Question.exam_id == exam.id).all()
-        for question in existing_questions:
-            # Delete rubric first (if exists)
-            rubric = db.query(Rubric).filter(Rubric.question_id == question.id).first()
-            if rubric:
-                db.delete(rubric)
-            # Delete question (answers will remain but won't be linked to valid questions)
-            db.delete(question)
+        # Step 1: Delete all existing questions and rubrics with two bulk DELETEs
+        # (rubrics first, since they reference the questions)
+        exam_question_ids = select(Question.id).where(Question.exam_id == exam.id)
+        db.query(Rubric).filter(Rubric.question_id.in_(exam_question_ids)).delete(synchronize_session=False)
+        deleted_count = db.query(Question).filter(Question.exam_id == exam.id).delete(synchronize_session=False)
         
         db.flush()
-        print(f"DEBUG: Deleted {len(existing_questions)} existing questions", flush=True)
+        logger.debug("Deleted %s existing questions of exam %s", deleted_count, exam.id)
         
         # Step 2: Update exam details
         exam.title = request.title
@@ -2532,15 +2946,18 @@ async def edit_exam(
         exam.temperature = 0.7
         
         db.flush()
-        print(f"DEBUG: Updated exam details", flush=True)
         
         # Step 3: Generate new questions using the same logic as generate_questions
         try:
-            # Complete the prompt template
+            # Complete the prompt template (no topic/difficulty/uploaded material when editing)
             prompt = QUESTION_GENERATION_TEMPLATE.format(
                 domain=request.domain,
+                topic="",
+                difficulty="mixed",
                 professor_instructions=request.instructions_to_llm or "No specific instructions provided.",
-                num_questions=request.number_of_questions
+                num_questions=request.number_of_questions,
+                uploaded_content_section="",
+                uploaded_content_instruction=""
             )
             
             # Call LLM
@@ -2564,8 +2981,9 @@ async def edit_exam(
             else:
                 question_data = [question_data]
             
-            # Create new questions
-            questions_list = []
+            # Build the new question rows
+            question_rows = []
+            valid_questions = []
             for idx, q_data in enumerate(question_data):
                 if not isinstance(q_data, dict):
                     continue
@@ -2574,46 +2992,54 @@ async def edit_exam(
                 rubric_data = q_data.get("grading_rubric", {})
                 total_points = rubric_data.get("total_points", 10.0)
                 
-                question = Question(
-                    exam_id=exam.id,
-                    q_index=idx + 1,
-                    prompt=q_data.get("question_text", ""),
-                    background_info=q_data.get("background_info", ""),
-                    model_answer=None,
-                    points_possible=total_points
-                )
-                db.add(question)
-                db.flush()
-                
-                # Store rubric
-                rubric_text = json.dumps(rubric_data, indent=2)
-                rubric = Rubric(
-                    question_id=question.id,
-                    rubric_text=rubric_text
-                )
-                db.add(rubric)
-                
-                questions_list.append({
-                    "question_id": str(question.id),
+                question_rows.append({
+                    "exam_id": exam.id,
+                    "q_index": idx + 1,
+                    "prompt": q_data.get("question_text", ""),
                     "background_info": q_data.get("background_info", ""),
-                    "question_text": q_data.get("question_text", ""),
-                    "grading_rubric": rubric_data,
-                    "domain_info": q_data.get("domain_info", "")
+                    "model_answer": None,
+                    "points_possible": total_points
                 })
+                valid_questions.append(q_data)
             
-            if len(questions_list) == 0:
+            if len(question_rows) == 0:
                 db.rollback()
                 raise HTTPException(
                     status_code=500,
                     detail="No valid questions were generated from the LLM response."
                 )
             
+            # Insert all questions in one batched statement, getting their ids back in order
+            question_ids = db.scalars(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                question_rows
+            ).all()
+            
+            # Store all rubrics with a single executemany
+            db.execute(insert(Rubric), [
+                {"question_id": question_id, "rubric_text": orjson.dumps(q_data.get("grading_rubric", {}), option=orjson.OPT_INDENT_2).decode()}
+                for question_id, q_data in zip(question_ids, valid_questions)
+            ])
+            
+            questions_list = [
+                {
+                    "question_id": str(question_id),
+                    "background_info": q_data.get("background_info", ""),
+                    "question_text": q_data.get("question_text", ""),
+                    "grading_rubric": q_data.get("grading_rubric", {}),
+                    "domain_info": q_data.get("domain_info", "")
+                }
+                for question_id, q_data in zip(question_ids, valid_questions)
+            ]
+            
             # Commit all changes
             db.commit()
             db.refresh(exam)
+            invalidate_exam_results(exam.id)
+            invalidate_exam_questions(exam.id)
             
             elapsed = time.time() - start_time
-            print(f"DEBUG: [SUCCESS] Updated exam {exam.id} with {len(questions_list)} new question(s) in {elapsed:.2f}s")
+            logger.debug("Updated exam %s with %s new question(s) in %.2fs", exam.id, len(questions_list), elapsed)
             
             return {
                 "success": True,
@@ -2628,9 +3054,7 @@ async def edit_exam(
         except Exception as e:
             db.rollback()
             elapsed = time.time() - start_time
-            print(f"DEBUG: [ERROR] Unexpected error generating questions after {elapsed:.2f}s: {type(e).__name__}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Unexpected error regenerating questions for exam %s after %.2fs", exam_id_int, elapsed)
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to regenerate questions: {str(e)}"
@@ -2650,9 +3074,7 @@ async def edit_exam(
         except:
             pass  # Session might already be closed
         elapsed = time.time() - start_time
-        print(f"DEBUG: [ERROR] Unexpected error editing exam after {elapsed:.2f}s: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error editing exam %s after %.2fs", exam_id, elapsed)
         raise HTTPException(
             status_code=500,
             detail=f"An error occurred while editing the exam: {str(e)}"
@@ -2699,37 +3121,43 @@ async def assign_exam(
     # Update exam with due date if provided
     exam.due_date = request.due_date if request.due_date else None
     
-    # Verify all students exist
+    # Verify all students exist (one query for all requested IDs)
+    students_by_id = {
+        student.id: student
+        for student in db.query(Student).filter(Student.id.in_(request.student_ids))
+    } if request.student_ids else {}
     students = []
     for student_id in request.student_ids:
-        student = db.query(Student).filter(Student.id == student_id).first()
+        student = students_by_id.get(student_id)
         if not student:
             raise HTTPException(status_code=404, detail=f"Student with ID {student_id} not found")
         students.append(student)
     
+    # Students that already have a submission for this exam
+    assigned_student_ids = {
+        student_id for (student_id,) in db.query(Submission.student_id).filter(
+            Submission.exam_id == exam.id,
+            Submission.student_id.in_(students_by_id)
+        )
+    } if students_by_id else set()
+    
     # Create submissions for each student (if they don't already have one)
-    assigned_count = 0
+    new_submissions = []
     already_assigned = []
     
     for student in students:
-        # Check if submission already exists
-        existing = db.query(Submission).filter(
-            Submission.exam_id == exam.id,
-            Submission.student_id == student.id
-        ).first()
-        
-        if existing:
+        if student.id in assigned_student_ids:
             already_assigned.append(student.name)
             continue
+        assigned_student_ids.add(student.id)  # A repeated ID in the request is only assigned once
         
-        # Create new submission (started_at is None until student actually starts the exam)
-        submission = Submission(
-            exam_id=exam.id,
-            student_id=student.id,
-            started_at=None  # Will be set when student actually starts the exam
-        )
-        db.add(submission)
-        assigned_count += 1
+        # New submission (started_at is None until student actually starts the exam)
+        new_submissions.append({"exam_id": exam.id, "student_id": student.id, "started_at": None})
+    
+    # Insert all new submissions with a single executemany
+    if new_submissions:
+        db.execute(Submission.__table__.insert(), new_submissions)
+    assigned_count = len(new_submissions)
     
     db.commit()
     
@@ -2780,27 +3208,26 @@ async def get_student_exam_answers(
         raise HTTPException(status_code=404, detail="No submission found for this student and exam")
     
     # Get all questions for this exam, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    questions = db.scalars(QUESTIONS_FOR_EXAM, {"exam_id": exam.id}).all()
+    question_ids = [q.id for q in questions]
+    
+    # Load rubrics and this submission's answers for all questions in two queries
+    rubrics_by_question = load_rubrics_by_question(db, question_ids)
+    answers_by_question = {
+        answer.question_id: answer
+        for answer in db.query(Answer).filter(
+            Answer.submission_id == submission.id,
+            Answer.question_id.in_(question_ids)
+        )
+    } if question_ids else {}
     
     questions_with_answers = []
     total_score = 0.0
     max_score = 0.0
     
     for q in questions:
-        # Get rubric for question
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-        rubric_data = {}
-        if rubric:
-            try:
-                rubric_data = json.loads(rubric.rubric_text)
-            except:
-                rubric_data = {"text": rubric.rubric_text}
-        
-        # Get answer for this question
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id
-        ).first()
+        rubric_data = parse_rubric(rubrics_by_question.get(q.id))
+        answer = answers_by_question.get(q.id)
         
         answer_data = None
         if answer:
@@ -2812,12 +3239,12 @@ async def get_student_exam_answers(
                 "response_text": answer.student_answer,
                 "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
                 "llm_feedback": answer.llm_feedback or "",
-                "graded_at": answer.graded_at.isoformat() if answer.graded_at else None,
+                "graded_at": answer.graded_at,
                 "grading_model_name": answer.grading_model_name,
-                "instructor_edited": bool(answer.instructor_edited) if answer.instructor_edited is not None else False,
+                "instructor_edited": bool(answer.instructor_edited),
                 "instructor_score": float(answer.instructor_score) if answer.instructor_score is not None else None,
                 "instructor_feedback": answer.instructor_feedback or "",
-                "instructor_edited_at": answer.instructor_edited_at.isoformat() if answer.instructor_edited_at else None,
+                "instructor_edited_at": answer.instructor_edited_at,
                 "final_score": final_score  # The score that should be displayed (instructor or LLM)
             }
             if final_score is not None:
@@ -2842,12 +3269,13 @@ async def get_student_exam_answers(
         AssignedExamDispute.submission_id == submission.id
     ).order_by(AssignedExamDispute.created_at.desc()).all()
     
+    questions_by_id = {q.id: q for q in questions}
     disputes_data = []
     for dispute in disputes:
         # Get question info if it's a question dispute
         question_info = None
         if dispute.question_id:
-            question = db.query(Question).filter(Question.id == dispute.question_id).first()
+            question = questions_by_id.get(dispute.question_id)
             if question:
                 question_info = {
                     "question_number": question.q_index,
@@ -2863,11 +3291,12 @@ async def get_student_exam_answers(
             "student_argument": dispute.student_argument,
             "instructor_decision": dispute.instructor_decision,
             "instructor_response": dispute.instructor_response,
-            "created_at": dispute.created_at.isoformat() if dispute.created_at else None,
-            "resolved_at": dispute.resolved_at.isoformat() if dispute.resolved_at else None,
+            "created_at": dispute.created_at,
+            "resolved_at": dispute.resolved_at,
         })
     
-    return {
+    # Datetimes are passed through as-is; orjson emits them as ISO 8601 itself
+    return ORJSONResponse({
         "exam_id": str(exam.id),
         "exam_title": exam.title or f"{exam.domain} Exam",
         "domain": exam.domain,
@@ -2875,14 +3304,14 @@ async def get_student_exam_answers(
         "student_name": student.name,
         "student_student_id": student.student_id,
         "submission_id": str(submission.id),
-        "started_at": submission.started_at.isoformat() if submission.started_at else None,
-        "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
+        "started_at": submission.started_at,
+        "submitted_at": submission.submitted_at,
         "total_score": round(total_score, 2),
         "max_score": round(max_score, 2),
         "percentage": percentage,
         "questions_with_answers": questions_with_answers,
         "disputes": disputes_data
-    }
+    })
 
 
 class UpdateGradeRequest(BaseModel):
@@ -2939,6 +3368,7 @@ async def update_answer_grade(
     answer.instructor_edited_at = datetime.utcnow()
     
     db.commit()
+    invalidate_submission_results(answer.submission_id)
     
     return {
         "success": True,
@@ -2954,7 +3384,7 @@ async def update_answer_grade(
 # Practice Exam Dispute Endpoints
 # ============================================================================
 
-def resolve_practice_submission(db: Session, exam_id: int, student: Student):
+def resolve_practice_submission(db: Session, exam_id: int, student: Student, with_answers: bool = False):
     """Resolve exam + latest graded submission for a practice exam dispute.
     
     Enforces:
@@ -2962,6 +3392,7 @@ def resolve_practice_submission(db: Session, exam_id: int, student: Student):
     - Exam is a practice exam owned by this student (strong check: exam.student_id == student.student_id)
     - A graded submission exists
     
+    With with_answers=True, submission.answers is eagerly loaded in the same round-trip.
     Returns (exam, submission) or raises HTTPException.
     """
     exam = db.query(Exam).filter(Exam.id == exam_id).first()
@@ -2974,7 +3405,10 @@ def resolve_practice_submission(db: Session, exam_id: int, student: Student):
         raise HTTPException(status_code=403, detail="Disputes are only available for your own practice exams")
 
     # Use codebase convention: order_by(started_at DESC), filter submitted_at IS NOT NULL
-    submission = db.query(Submission).filter(
+    query = db.query(Submission)
+    if with_answers:
+        query = query.options(selectinload(Submission.answers))
+    submission = query.filter(
         Submission.exam_id == exam_id,
         Submission.student_id == student.id,
         Submission.submitted_at.isnot(None)
@@ -2986,29 +3420,32 @@ def resolve_practice_submission(db: Session, exam_id: int, student: Student):
     return exam, submission
 
 
+# Practice dispute lock state in one round-trip: q_index values of the submission's disputed
+# questions (comma-separated), whether an overall dispute exists, and the exam's question count
+LOCK_STATE_FOR_SUBMISSION = select(
+    select(func.group_concat(Question.q_index))
+    .join(Answer, Answer.question_id == Question.id)
+    .join(Regrade, Regrade.answer_id == Answer.id)
+    .where(Answer.submission_id == bindparam("submission_id"))
+    .scalar_subquery().label("disputed_q_indices"),
+    exists().where(SubmissionRegrade.submission_id == bindparam("submission_id")).label("overall_used"),
+    select(Exam.question_count).where(Exam.id == bindparam("exam_id")).scalar_subquery().label("num_questions"),
+)
+
+
 def _build_lock_state(db: Session, submission: Submission, exam_id: int):
     """Build the lock_state dict for a submission (used by both endpoints)."""
-    # Disputed questions: find Regrade rows for this submission's answers
-    disputed_q_indices = (
-        db.query(Question.q_index)
-        .join(Answer, Answer.question_id == Question.id)
-        .join(Regrade, Regrade.answer_id == Answer.id)
-        .filter(Answer.submission_id == submission.id)
-        .all()
-    )
-    disputed_questions = sorted([row[0] for row in disputed_q_indices])
-
-    # Overall used
-    overall_used = db.query(SubmissionRegrade).filter(
-        SubmissionRegrade.submission_id == submission.id
-    ).first() is not None
+    row = db.execute(LOCK_STATE_FOR_SUBMISSION, {"submission_id": submission.id, "exam_id": exam_id}).one()
 
-    num_questions = db.query(Question).filter(Question.exam_id == exam_id).count()
+    # Disputed questions: q_index of questions whose answers have a Regrade row
+    disputed_questions = sorted(
+        int(q_index) for q_index in row.disputed_q_indices.split(",")
+    ) if row.disputed_q_indices else []
 
     return {
-        "overall_used": overall_used,
+        "overall_used": bool(row.overall_used),
         "disputed_questions": disputed_questions,
-        "num_questions": num_questions,
+        "num_questions": row.num_questions or 0,
     }
 
 
@@ -3022,18 +3459,10 @@ class DisputeRequest(BaseModel):
 @router.get("/api/practice/dispute/state", tags=["disputes"])
 async def get_dispute_state(
     exam_id: int,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db),
 ):
     """Get the current dispute lock state for a practice exam submission."""
-    # Two-step student resolution (existing convention)
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-
     exam, submission = resolve_practice_submission(db, exam_id, student)
 
     lock = _build_lock_state(db, submission, exam.id)
@@ -3044,28 +3473,98 @@ async def get_dispute_state(
 @router.post("/api/practice/dispute", tags=["disputes"])
 async def submit_dispute(
     request: DisputeRequest,
-    current_user: User = Depends(require_auth),
+    student: Student = Depends(get_current_student),
     db: Session = Depends(get_db),
 ):
     """Submit a grade dispute for a practice exam (question-level or overall)."""
-    # Two-step student resolution (existing convention)
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-
-    exam, submission = resolve_practice_submission(db, request.exam_id, student)
+    exam, submission = resolve_practice_submission(db, request.exam_id, student, with_answers=True)
 
     # Validate target
     if request.target not in ("question", "overall"):
         raise HTTPException(status_code=400, detail="target must be 'question' or 'overall'")
 
     if request.target == "question":
-        return await _handle_question_dispute(db, exam, submission, request)
+        return ORJSONResponse(await _handle_question_dispute(db, exam, submission, request))
     else:
-        return await _handle_overall_dispute(db, exam, submission, request)
+        return ORJSONResponse(await _handle_overall_dispute(db, exam, submission, request))
+
+
+# Deferred practice disputes keyed by job id: {"student_id", "status", "result" | "error"}.
+# Process-local like the other caches (the app runs as a single process); finished jobs
+# expire after an hour.
+dispute_jobs = TTLCache(maxsize=4096, ttl=3600)
+
+# LLM adjudications of practice disputes keyed by (submission_id, question_id or None for
+# overall, sha256 of the argument), so retrying an identical dispute (e.g. after a failed
+# save) reuses the result instead of repeating the multi-second LLM round-trip
+dispute_results_cache = TTLCache(maxsize=1024, ttl=3600)
+
+
+def dispute_result_cache_key(submission_id: int, question_id: Optional[int], argument: str) -> Tuple:
+    """Cache key for a practice dispute's LLM result"""
+    return (submission_id, question_id, hashlib.sha256(argument.encode()).hexdigest())
+
+
+async def run_dispute_job(job_id: str, student_id: int, request: DisputeRequest):
+    """Adjudicate a deferred practice dispute on its own session and record the outcome"""
+    job = dispute_jobs.get(job_id) or {"student_id": student_id}
+    db = SessionLocal()
+    try:
+        student = db.get(Student, student_id)
+        exam, submission = resolve_practice_submission(db, request.exam_id, student, with_answers=True)
+        if request.target == "question":
+            result = await _handle_question_dispute(db, exam, submission, request)
+        else:
+            result = await _handle_overall_dispute(db, exam, submission, request)
+        job.update(status="done", result=result)
+    except HTTPException as e:
+        db.rollback()
+        job.update(status="error", error={"status_code": e.status_code, "detail": e.detail})
+    except Exception:
+        db.rollback()
+        logger.exception("Deferred dispute job %s failed", job_id)
+        job.update(status="error", error={"status_code": 500, "detail": "Failed to process dispute"})
+    finally:
+        db.close()
+    dispute_jobs.set(job_id, job)
+
+
+@router.post("/api/practice/dispute/deferred", tags=["disputes"], status_code=202)
+async def submit_dispute_deferred(
+    request: DisputeRequest,
+    background_tasks: BackgroundTasks,
+    student: Student = Depends(get_current_student),
+    db: Session = Depends(get_db),
+):
+    """Queue a practice exam dispute and return immediately
+    
+    Ownership and target are validated up front; the LLM adjudication runs after the
+    response is sent. Poll GET /api/practice/dispute/jobs/{job_id} until status is
+    "done" (result holds the same payload POST /api/practice/dispute returns) or
+    "error" (error holds the status_code/detail the synchronous endpoint would raise).
+    """
+    resolve_practice_submission(db, request.exam_id, student)
+
+    # Validate target
+    if request.target not in ("question", "overall"):
+        raise HTTPException(status_code=400, detail="target must be 'question' or 'overall'")
+
+    job_id = uuid.uuid4().hex
+    dispute_jobs.set(job_id, {"student_id": student.id, "status": "pending"})
+    background_tasks.add_task(run_dispute_job, job_id, student.id, request)
+    return {"job_id": job_id, "status": "pending"}
+
+
+@router.get("/api/practice/dispute/jobs/{job_id}", tags=["disputes"])
+async def get_dispute_job(
+    job_id: str,
+    student: Student = Depends(get_current_student),
+):
+    """Get the status (and, once finished, the outcome) of a deferred practice dispute"""
+    job = dispute_jobs.get(job_id)
+    if not job or job["student_id"] != student.id:
+        raise HTTPException(status_code=404, detail="Dispute job not found")
+    return {"job_id": job_id, **{key: value for key, value in job.items() if key != "student_id"}}
 
 
 async def _handle_question_dispute(
@@ -3076,7 +3575,7 @@ async def _handle_question_dispute(
     if request.question_number is None:
         raise HTTPException(status_code=400, detail="question_number is required for question disputes")
 
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    questions = db.scalars(QUESTIONS_FOR_EXAM, {"exam_id": exam.id}).all()
     num_questions = len(questions)
 
     if request.question_number < 1 or request.question_number > num_questions:
@@ -3087,48 +3586,53 @@ async def _handle_question_dispute(
     if not question:
         raise HTTPException(status_code=404, detail=f"Question {request.question_number} not found")
 
-    # Find the answer
-    answer = db.query(Answer).filter(
-        Answer.submission_id == submission.id,
-        Answer.question_id == question.id,
-    ).first()
+    # Find the answer (submission.answers is eagerly loaded by resolve_practice_submission)
+    answer = next((a for a in submission.answers if a.question_id == question.id), None)
     if not answer:
         raise HTTPException(status_code=404, detail="No answer found for this question")
 
     # Enforcement: block if overall dispute already exists
-    overall_exists = db.query(SubmissionRegrade).filter(
+    overall_exists = db.query(db.query(SubmissionRegrade).filter(
         SubmissionRegrade.submission_id == submission.id
-    ).first()
+    ).exists()).scalar()
     if overall_exists:
         raise HTTPException(status_code=409, detail="Overall dispute already submitted; disputes locked for this attempt.")
 
     # Enforcement: block if this question already has a regrade
-    existing_regrade = db.query(Regrade).filter(Regrade.answer_id == answer.id).first()
+    existing_regrade = db.query(db.query(Regrade).filter(Regrade.answer_id == answer.id).exists()).scalar()
     if existing_regrade:
         raise HTTPException(status_code=409, detail="You can only dispute each question once.")
 
     # Build LLM payload
-    rubric = db.query(Rubric).filter(Rubric.question_id == question.id).first()
+    rubric = db.scalars(RUBRIC_FOR_QUESTION, {"question_id": question.id}).first()
     rubric_text = rubric.rubric_text if rubric else "No rubric available"
 
     original_score = float(answer.llm_score) if answer.llm_score is not None else 0.0
     original_feedback = answer.llm_feedback or "No feedback"
 
-    # Call LLM
-    try:
-        llm_result = await adjudicate_dispute_question(
-            question_text=question.prompt,
-            rubric_text=rubric_text,
-            student_answer=answer.student_answer,
-            original_score=original_score,
-            original_feedback=original_feedback,
-            student_argument=request.argument,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:
-        print(f"DEBUG: Unexpected error in question dispute LLM call: {exc}")
-        raise HTTPException(status_code=503, detail="AI service error. Please try again.")
+    # Everything the LLM needs is loaded: close the session so its connection goes back to
+    # the pool for the length of the LLM call (loaded objects keep their state once detached)
+    db.close()
+
+    # Call LLM, unless this exact dispute was already adjudicated
+    cache_key = dispute_result_cache_key(submission.id, question.id, request.argument)
+    llm_result = dispute_results_cache.get(cache_key)
+    if llm_result is None:
+        try:
+            llm_result = await adjudicate_dispute_question(
+                question_text=question.prompt,
+                rubric_text=rubric_text,
+                student_answer=answer.student_answer,
+                original_score=original_score,
+                original_feedback=original_feedback,
+                student_argument=request.argument,
+            )
+        except HTTPException:
+            raise
+        except Exception as exc:
+            print(f"DEBUG: Unexpected error in question dispute LLM call: {exc}")
+            raise HTTPException(status_code=503, detail="AI service error. Please try again.")
+        dispute_results_cache.set(cache_key, llm_result)
 
     decision = llm_result["decision"]
     new_score = float(llm_result["question_score_new"])
@@ -3140,18 +3644,23 @@ async def _handle_question_dispute(
         student_argument=request.argument,
         regrade_score=new_score,
         regrade_feedback=new_feedback,
-        llm_response=json.dumps(llm_result),
+        llm_response=orjson.dumps(llm_result).decode(),
         regraded_at=datetime.utcnow(),
         regrade_model_name=TOGETHER_AI_MODEL,
         regrade_temperature=0.3,
     )
     db.add(regrade)
 
-    # If decision is "update", also update the Answer
-    old_total = _compute_submission_total(db, submission)
+    # If decision is "update", also update the Answer; the new total follows from the
+    # change in this answer's final score, so it is not re-summed after the commit
+    old_total = _compute_submission_total(submission)
+    new_total = old_total
     if decision == "update":
+        db.add(answer)  # re-attach the answer detached by db.close() above
+        old_final_score = _answer_final_score(answer)
         answer.llm_score = new_score
         answer.llm_feedback = new_feedback
+        new_total = round(old_total - old_final_score + _answer_final_score(answer), 2)
 
     try:
         db.commit()
@@ -3159,8 +3668,8 @@ async def _handle_question_dispute(
         db.rollback()
         print(f"DEBUG: DB error saving regrade: {exc}")
         raise HTTPException(status_code=409, detail="Could not save dispute — it may already exist.")
+    invalidate_submission_results(submission.id)
 
-    new_total = _compute_submission_total(db, submission)
     lock_state = _build_lock_state(db, submission, exam.id)
 
     return {
@@ -3186,108 +3695,108 @@ async def _handle_overall_dispute(
 ):
     """Handle an overall exam dispute."""
     # Enforcement: block if any question-level regrades exist
-    question_regrades_count = (
+    has_question_regrades = db.query(
         db.query(Regrade)
         .join(Answer, Regrade.answer_id == Answer.id)
         .filter(Answer.submission_id == submission.id)
-        .count()
-    )
-    if question_regrades_count > 0:
+        .exists()
+    ).scalar()
+    if has_question_regrades:
         raise HTTPException(
             status_code=409,
             detail="Overall review is only available before disputing individual questions.",
         )
 
     # Enforcement: block if overall already submitted
-    existing_overall = db.query(SubmissionRegrade).filter(
+    existing_overall = db.query(db.query(SubmissionRegrade).filter(
         SubmissionRegrade.submission_id == submission.id
-    ).first()
+    ).exists()).scalar()
     if existing_overall:
         raise HTTPException(status_code=409, detail="Overall dispute already submitted for this attempt.")
 
-    # Gather all questions, rubrics, answers
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
-    old_total = _compute_submission_total(db, submission)
-
-    # Build the big context string for the LLM
-    qa_parts = []
-    for q in questions:
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id,
-        ).first()
-        rubric = db.query(Rubric).filter(Rubric.question_id == q.id).first()
-
-        score = float(answer.llm_score) if answer and answer.llm_score is not None else 0.0
-        feedback = answer.llm_feedback if answer else "No feedback"
-        rubric_text = rubric.rubric_text if rubric else "No rubric"
-        student_answer = answer.student_answer if answer else "No answer"
-
-        qa_parts.append(
-            f"--- Question {q.q_index} ---\n"
-            f"Question: {q.prompt}\n"
-            f"Rubric: {rubric_text}\n"
-            f"Student Answer: {student_answer}\n"
-            f"Original Score: {score}\n"
-            f"Original Feedback: {feedback}\n"
-        )
-
-    questions_and_answers = "\n".join(qa_parts)
-
-    # Snapshot old results
+    # Gather all questions, rubrics, answers keyed by question_id
+    # (submission.answers is eagerly loaded by resolve_practice_submission)
+    questions = db.scalars(QUESTIONS_FOR_EXAM, {"exam_id": exam.id}).all()
+    answers_by_question = {answer.question_id: answer for answer in submission.answers}
+    rubrics_by_question = load_rubrics_by_question(db, [q.id for q in questions])
+    old_total = _compute_submission_total(submission)
+
+    # One pass over the questions: pair each with its answer (also keyed by q_index for
+    # applying the LLM's question_updates), build the per-question context for the LLM
+    # (each question is adjudicated separately, concurrently) and snapshot the old results
+    question_answers = []
+    answers_by_index = {}
+    dispute_questions = []
     old_results = []
     for q in questions:
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id,
-        ).first()
+        answer = answers_by_question.get(q.id)
+        rubric = rubrics_by_question.get(q.id)
+        question_answers.append((q, answer))
+        answers_by_index[q.q_index] = answer
+
+        dispute_questions.append({
+            "question_number": q.q_index,
+            "question_text": q.prompt,
+            "rubric_text": rubric.rubric_text if rubric else "No rubric",
+            "student_answer": answer.student_answer if answer else "No answer",
+            "original_score": float(answer.llm_score) if answer and answer.llm_score is not None else 0.0,
+            "original_feedback": answer.llm_feedback if answer else "No feedback",
+        })
         old_results.append({
             "q_index": q.q_index,
             "score": float(answer.llm_score) if answer and answer.llm_score is not None else None,
             "feedback": answer.llm_feedback if answer else None,
         })
 
-    # Call LLM
-    try:
-        llm_result = await adjudicate_dispute_overall(
-            questions_and_answers=questions_and_answers,
-            student_argument=request.argument,
-            total_old=old_total,
-        )
-    except HTTPException:
-        raise
-    except Exception as exc:
-        print(f"DEBUG: Unexpected error in overall dispute LLM call: {exc}")
-        raise HTTPException(status_code=503, detail="AI service error. Please try again.")
+    # Close the session so its connection goes back to the pool for the length of the LLM
+    # calls (loaded objects keep their state once detached)
+    db.close()
+
+    # Call LLM, unless this exact dispute was already adjudicated
+    cache_key = dispute_result_cache_key(submission.id, None, request.argument)
+    llm_result = dispute_results_cache.get(cache_key)
+    if llm_result is None:
+        try:
+            llm_result = await adjudicate_dispute_overall_by_question(
+                questions=dispute_questions,
+                student_argument=request.argument,
+                total_old=old_total,
+            )
+        except HTTPException:
+            raise
+        except Exception as exc:
+            print(f"DEBUG: Unexpected error in overall dispute LLM call: {exc}")
+            raise HTTPException(status_code=503, detail="AI service error. Please try again.")
+        dispute_results_cache.set(cache_key, llm_result)
 
     decision = llm_result["decision"]
     explanation = llm_result.get("overall_explanation", "No explanation provided.")
 
-    # Apply updates if decision is "update"
+    # Apply updates if decision is "update", accumulating the change in the total as we go.
+    # The detached answers are updated in memory for the snapshot below, and written back
+    # with one batched UPDATE by primary key
+    total_delta = 0.0
+    answer_updates = []
     if decision == "update":
-        q_map = {q.q_index: q for q in questions}
         for upd in llm_result.get("question_updates", []):
             q_num = upd.get("question_number")
-            if q_num and q_num in q_map:
-                q = q_map[q_num]
-                answer = db.query(Answer).filter(
-                    Answer.submission_id == submission.id,
-                    Answer.question_id == q.id,
-                ).first()
+            if q_num:
+                answer = answers_by_index.get(q_num)
                 if answer:
+                    old_final_score = _answer_final_score(answer)
                     answer.llm_score = float(upd["score_new"])
                     if upd.get("feedback_new"):
                         answer.llm_feedback = upd["feedback_new"]
+                    total_delta += _answer_final_score(answer) - old_final_score
+                    answer_updates.append({"id": answer.id, "llm_score": answer.llm_score, "llm_feedback": answer.llm_feedback})
+    if answer_updates:
+        db.execute(update(Answer), answer_updates)
 
-    new_total = _compute_submission_total(db, submission)
+    new_total = round(old_total + total_delta, 2)
 
     # Build new results snapshot
     new_results = []
-    for q in questions:
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id,
-        ).first()
+    for q, answer in question_answers:
         new_results.append({
             "q_index": q.q_index,
             "score": float(answer.llm_score) if answer and answer.llm_score is not None else None,
@@ -3302,8 +3811,8 @@ async def _handle_overall_dispute(
         explanation=explanation,
         old_total_score=int(old_total),
         new_total_score=int(new_total),
-        old_results_json=json.dumps(old_results),
-        new_results_json=json.dumps(new_results),
+        old_results_json=orjson.dumps(old_results).decode(),
+        new_results_json=orjson.dumps(new_results).decode(),
         model_name=TOGETHER_AI_MODEL,
     )
     db.add(sub_regrade)
@@ -3314,6 +3823,7 @@ async def _handle_overall_dispute(
         db.rollback()
         print(f"DEBUG: DB error saving overall regrade: {exc}")
         raise HTTPException(status_code=409, detail="Could not save dispute — it may already exist.")
+    invalidate_submission_results(submission.id)
 
     lock_state = _build_lock_state(db, submission, exam.id)
 
@@ -3335,16 +3845,19 @@ async def _handle_overall_dispute(
     }
 
 
-def _compute_submission_total(db: Session, submission: Submission) -> float:
-    """Compute the total score for a submission from its answers."""
-    answers = db.query(Answer).filter(Answer.submission_id == submission.id).all()
-    total = 0.0
-    for a in answers:
-        if a.instructor_edited and a.instructor_score is not None:
-            total += float(a.instructor_score)
-        elif a.llm_score is not None:
-            total += float(a.llm_score)
-    return round(total, 2)
+def _answer_final_score(answer: Answer) -> float:
+    """An answer's contribution to its submission total (Python twin of FINAL_ANSWER_SCORE)"""
+    if answer.instructor_edited and answer.instructor_score is not None:
+        return float(answer.instructor_score)
+    return float(answer.llm_score) if answer.llm_score is not None else 0.0
+
+
+def _compute_submission_total(submission: Submission) -> float:
+    """Compute the total score for a submission from its answers.
+    
+    Sums the already-loaded submission.answers in Python, so it costs no query.
+    """
+    return round(sum(_answer_final_score(answer) for answer in submission.answers), 2)
 
 
 # ============================================================================
@@ -3356,20 +3869,17 @@ def resolve_assigned_submission(db: Session, exam_id: int, student: Student):
     Returns (exam, submission) tuple.
     Raises HTTPException if not found or invalid.
     """
-    exam = db.query(Exam).filter(Exam.id == exam_id).first()
-    if not exam:
+    # Load the exam with this student's latest submission in one query (the submission is
+    # outer joined so a missing exam and a missing submission are still told apart)
+    row = db.execute(EXAM_WITH_LATEST_SUBMISSION, {"exam_id": exam_id, "student_id": student.id}).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Exam not found")
+    exam, submission = row
     
     # Verify this is an assigned exam (not a practice exam)
     if exam.student_id is not None:
         raise HTTPException(status_code=400, detail="This endpoint is only for assigned exams, not practice exams")
     
-    # Get the latest submission for this student and exam
-    submission = db.query(Submission).filter(
-        Submission.exam_id == exam_id,
-        Submission.student_id == student.id
-    ).order_by(Submission.submitted_at.desc()).first()
-    
     if not submission:
         raise HTTPException(status_code=404, detail="No submission found for this exam")
     
@@ -3391,48 +3901,29 @@ class AssignedDisputeRequest(BaseModel):
 async def get_assigned_dispute_state(
     exam_id: int,
     current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_reads),
 ):
     """Get the current dispute state for an assigned exam submission."""
     if current_user.user_type != "student":
         raise HTTPException(status_code=403, detail="Only students can access this endpoint")
     
-    # Get student
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
+    student = get_current_student(current_user, db)
     exam, submission = resolve_assigned_submission(db, exam_id, student)
     
-    # Get all disputes for this submission
-    disputes = db.query(AssignedExamDispute).filter(
-        AssignedExamDispute.submission_id == submission.id
-    ).all()
+    # Get the question number (q_index) of every dispute for this submission in one query
+    disputes = db.execute(DISPUTED_QUESTION_INDEXES_FOR_SUBMISSION, {"submission_id": submission.id}).all()
     
     # Check for overall dispute
-    overall_dispute = next((d for d in disputes if d.question_id is None), None)
-    overall_used = overall_dispute is not None
-    
-    # Get disputed question IDs
-    disputed_question_ids = [d.question_id for d in disputes if d.question_id is not None]
-    
-    # Get questions to determine count
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
-    num_questions = len(questions)
+    overall_used = any(dispute.question_id is None for dispute in disputes)
     
-    # Map question IDs to question numbers (q_index)
-    disputed_questions = []
-    for q in questions:
-        if q.id in disputed_question_ids:
-            disputed_questions.append(q.q_index)
+    # Question numbers of the disputed questions
+    disputed_questions = [dispute.q_index for dispute in disputes if dispute.q_index is not None]
     
     return {
         "overall_used": overall_used,
         "disputed_questions": sorted(disputed_questions),
-        "num_questions": num_questions,
+        # Trigger-maintained count, so no questions need to be loaded
+        "num_questions": exam.question_count,
         "submission_id": submission.id,
     }
 
@@ -3447,27 +3938,20 @@ async def submit_assigned_dispute(
     if current_user.user_type != "student":
         raise HTTPException(status_code=403, detail="Only students can submit disputes")
     
-    # Get student
-    if current_user.user_type == "student" and current_user.student_id:
-        student = db.query(Student).filter(Student.id == current_user.student_id).first()
-        if not student:
-            raise HTTPException(status_code=404, detail="Student record not found for user")
-    else:
-        student = get_or_create_student(db, current_user.username, name=current_user.username)
-    
+    student = get_current_student(current_user, db)
     exam, submission = resolve_assigned_submission(db, request.exam_id, student)
     
     # Validate target
     if request.target not in ("question", "overall"):
         raise HTTPException(status_code=400, detail="target must be 'question' or 'overall'")
     
+    # Load which questions (None = overall) already have a dispute, once for every check below
+    disputed_question_ids = set(db.scalars(DISPUTED_QUESTION_IDS_FOR_SUBMISSION, {"submission_id": submission.id}))
+    has_overall_dispute = None in disputed_question_ids
+    
     # Check for existing overall dispute
     if request.target == "overall":
-        existing = db.query(AssignedExamDispute).filter(
-            AssignedExamDispute.submission_id == submission.id,
-            AssignedExamDispute.question_id.is_(None)
-        ).first()
-        if existing:
+        if has_overall_dispute:
             raise HTTPException(status_code=409, detail="Overall dispute already submitted for this exam")
         question_id = None
     else:
@@ -3475,34 +3959,24 @@ async def submit_assigned_dispute(
         if request.question_number is None:
             raise HTTPException(status_code=400, detail="question_number is required for question disputes")
         
-        questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
-        num_questions = len(questions)
+        question_indexes = get_exam_question_indexes(db, exam.id)
+        num_questions = len(question_indexes)
         
         if request.question_number < 1 or request.question_number > num_questions:
             raise HTTPException(status_code=400, detail=f"question_number must be between 1 and {num_questions}")
         
         # Find the question
-        question = next((q for q in questions if q.q_index == request.question_number), None)
-        if not question:
+        question_id = next((q_id for q_id, q_index in question_indexes if q_index == request.question_number), None)
+        if question_id is None:
             raise HTTPException(status_code=404, detail=f"Question {request.question_number} not found")
         
         # Check for existing dispute for this question
-        existing = db.query(AssignedExamDispute).filter(
-            AssignedExamDispute.submission_id == submission.id,
-            AssignedExamDispute.question_id == question.id
-        ).first()
-        if existing:
+        if question_id in disputed_question_ids:
             raise HTTPException(status_code=409, detail="You can only dispute each question once.")
         
-        question_id = question.id
-    
-    # Check for overall dispute (blocks question disputes)
-    overall_exists = db.query(AssignedExamDispute).filter(
-        AssignedExamDispute.submission_id == submission.id,
-        AssignedExamDispute.question_id.is_(None)
-    ).first()
-    if overall_exists:
-        raise HTTPException(status_code=409, detail="Overall dispute already submitted; disputes locked for this attempt.")
+        # Check for overall dispute (blocks question disputes)
+        if has_overall_dispute:
+            raise HTTPException(status_code=409, detail="Overall dispute already submitted; disputes locked for this attempt.")
     
     # Create dispute record
     dispute = AssignedExamDispute(
@@ -3519,6 +3993,7 @@ async def submit_assigned_dispute(
         db.rollback()
         print(f"DEBUG: DB error saving dispute: {exc}")
         raise HTTPException(status_code=500, detail="Could not save dispute. Please try again.")
+    invalidate_submission_results(submission.id)
     
     return {
         "ok": True,
@@ -3531,7 +4006,7 @@ async def submit_assigned_dispute(
 @router.get("/api/instructor/disputes", tags=["instructor"])
 async def get_instructor_disputes(
     current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_reads),
 ):
     """Get all pending disputes for exams created by the current instructor."""
     if current_user.user_type != "instructor":
@@ -3541,111 +4016,142 @@ async def get_instructor_disputes(
     instructor = get_or_create_instructor_for_user(db, current_user)
     
     # Get all disputes for exams created by this instructor
-    # Join through submission -> exam -> instructor
-    disputes = db.query(AssignedExamDispute).join(
+    # Join through submission -> exam -> instructor, selecting only the columns the listing
+    # needs; the disputed question (if any) is outer joined for its q_index/prompt
+    rows = db.query(
+        AssignedExamDispute.id,
+        AssignedExamDispute.question_id,
+        AssignedExamDispute.student_argument,
+        AssignedExamDispute.created_at,
+        Submission.id.label("submission_id"),
+        Exam.id.label("exam_id"),
+        Exam.title.label("exam_title"),
+        Exam.domain,
+        Student.id.label("student_id"),
+        Student.name.label("student_name"),
+        Student.student_id.label("student_number"),
+        Question.q_index,
+        Question.prompt,
+    ).join(
         Submission, AssignedExamDispute.submission_id == Submission.id
     ).join(
         Exam, Submission.exam_id == Exam.id
+    ).join(
+        Student, Submission.student_id == Student.id
+    ).outerjoin(
+        Question, Question.id == AssignedExamDispute.question_id
     ).filter(
         Exam.instructor_id == instructor.id,
         AssignedExamDispute.status == "pending"
     ).order_by(AssignedExamDispute.created_at.desc()).all()
     
     disputes_data = []
-    for dispute in disputes:
-        submission = dispute.submission
-        exam = submission.exam
-        student = submission.student
-        
+    for row in rows:
         # Get question info if it's a question dispute
         question_info = None
-        if dispute.question_id:
-            question = db.query(Question).filter(Question.id == dispute.question_id).first()
-            if question:
-                question_info = {
-                    "question_number": question.q_index,
-                    "prompt": question.prompt,
-                }
+        if row.question_id and row.q_index is not None:
+            question_info = {
+                "question_number": row.q_index,
+                "prompt": row.prompt,
+            }
         
         disputes_data.append({
-            "dispute_id": dispute.id,
-            "exam_id": exam.id,
-            "exam_title": exam.title or exam.domain,
-            "student_id": student.id,
-            "student_name": student.name or student.student_id,
-            "submission_id": submission.id,
-            "question_id": dispute.question_id,
+            "dispute_id": row.id,
+            "exam_id": row.exam_id,
+            "exam_title": row.exam_title or row.domain,
+            "student_id": row.student_id,
+            "student_name": row.student_name or row.student_number,
+            "submission_id": row.submission_id,
+            "question_id": row.question_id,
             "question_info": question_info,
-            "target": "question" if dispute.question_id else "overall",
-            "student_argument": dispute.student_argument,
-            "created_at": dispute.created_at.isoformat() if dispute.created_at else None,
+            "target": "question" if row.question_id else "overall",
+            "student_argument": row.student_argument,
+            "created_at": row.created_at,
         })
     
-    return {
+    # Datetimes are passed through as-is; orjson emits them as ISO 8601 itself
+    return ORJSONResponse({
         "disputes": disputes_data,
         "count": len(disputes_data),
-    }
+    })
 
 
 @router.get("/api/instructor/submission/{submission_id}", tags=["instructor"])
 async def get_submission_details(
     submission_id: int,
     current_user: User = Depends(require_auth),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_reads),
 ):
     """Get submission details with answers for instructor review (used for disputes)"""
     if current_user.user_type != "instructor":
         raise HTTPException(status_code=403, detail="Only instructors can view submissions")
     
-    # Get submission
-    submission = db.query(Submission).filter(Submission.id == submission_id).first()
-    if not submission:
+    # Load submission, exam and student columns in one query (exam/student are outer joined
+    # so the specific missing piece can still be reported); nothing here is modified, so
+    # plain rows are selected instead of ORM objects
+    row = db.execute(select(
+        Submission.id.label("submission_id"),
+        Exam.id.label("exam_id"),
+        Exam.instructor_id,
+        Exam.title,
+        Exam.domain,
+        Student.id.label("student_id"),
+        Student.name.label("student_name"),
+        Student.student_id.label("student_number"),
+    ).outerjoin(
+        Exam, Exam.id == Submission.exam_id
+    ).outerjoin(
+        Student, Student.id == Submission.student_id
+    ).where(Submission.id == submission_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Submission not found")
     
-    # Get exam and verify ownership
-    exam = db.query(Exam).filter(Exam.id == submission.exam_id).first()
-    if not exam:
+    # Verify exam ownership
+    if row.exam_id is None:
         raise HTTPException(status_code=404, detail="Exam not found")
     
     instructor = get_or_create_instructor_for_user(db, current_user)
-    if exam.instructor_id != instructor.id:
+    if row.instructor_id != instructor.id:
         raise HTTPException(status_code=403, detail="You can only view submissions for your own exams")
     
-    # Get student
-    student = db.query(Student).filter(Student.id == submission.student_id).first()
-    if not student:
+    if row.student_id is None:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Get all questions for this exam, ordered by q_index
-    questions = db.query(Question).filter(Question.exam_id == exam.id).order_by(Question.q_index).all()
+    # Load every answered question with its answer in one query, ordered by q_index
+    answered_questions = db.execute(select(
+        Question.id,
+        Question.q_index,
+        Question.prompt,
+        Question.points_possible,
+        Answer.student_answer,
+        Answer.llm_score,
+        Answer.llm_feedback,
+        Answer.instructor_edited,
+        Answer.instructor_score,
+    ).join(
+        Answer, and_(Answer.question_id == Question.id, Answer.submission_id == row.submission_id)
+    ).where(Question.exam_id == row.exam_id).order_by(Question.q_index)).all()
     
     answers_data = []
-    for q in questions:
-        # Get answer for this question
-        answer = db.query(Answer).filter(
-            Answer.submission_id == submission.id,
-            Answer.question_id == q.id
-        ).first()
-        
-        if answer:
-            answers_data.append({
-                "question_id": q.id,
-                "question_number": q.q_index,
-                "question_prompt": q.prompt,
-                "student_answer": answer.student_answer,
-                "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
-                "llm_feedback": answer.llm_feedback or "",
-                "points_possible": float(q.points_possible),
-                "instructor_edited": bool(answer.instructor_edited) if answer.instructor_edited is not None else False,
-                "instructor_score": float(answer.instructor_score) if answer.instructor_score is not None else None,
-            })
+    for answer in answered_questions:
+        answers_data.append({
+            "question_id": answer.id,
+            "question_number": answer.q_index,
+            "question_prompt": answer.prompt,
+            "student_answer": answer.student_answer,
+            "llm_score": float(answer.llm_score) if answer.llm_score is not None else None,
+            "llm_feedback": answer.llm_feedback or "",
+            "points_possible": float(answer.points_possible),
+            "instructor_edited": bool(answer.instructor_edited),
+            "instructor_score": float(answer.instructor_score) if answer.instructor_score is not None else None,
+        })
     
     return {
-        "submission_id": submission.id,
-        "exam_id": exam.id,
-        "exam_title": exam.title or exam.domain,
-        "student_id": student.id,
-        "student_name": student.name or student.student_id,
+        "submission_id": row.submission_id,
+        "exam_id": row.exam_id,
+        "exam_title": row.title or row.domain,
+        "student_id": row.student_id,
+        "student_name": row.student_name or row.student_number,
         "answers": answers_data,
     }
 
@@ -3709,6 +4215,7 @@ async def resolve_dispute(
         db.rollback()
         print(f"DEBUG: DB error resolving dispute: {exc}")
         raise HTTPException(status_code=500, detail="Could not resolve dispute. Please try again.")
+    invalidate_submission_results(submission.id)
     
     return {
         "success": True,
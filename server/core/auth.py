@@ -8,11 +8,16 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import secrets
 
+from server.core.cache import TTLCache
 from server.core.database import get_db
 from server.core.db_models import User
 
-# Simple session storage (in production, use Redis or database sessions)
-active_sessions = {}
+# Session lifetime in seconds (matches the session_token cookie's max_age)
+SESSION_TTL_SECONDS = 86400
+
+# In-process session storage (the app runs as a single process). Sessions expire with the
+# cookie and the store is bounded, evicting the least recently used session when full.
+active_sessions = TTLCache(maxsize=10000, ttl=SESSION_TTL_SECONDS)
 
 security = HTTPBearer(auto_error=False)
 
@@ -20,10 +25,10 @@ security = HTTPBearer(auto_error=False)
 def create_session(user_id: int, username: str) -> str:
     """Create a new session and return session token"""
     session_token = secrets.token_urlsafe(32)
-    active_sessions[session_token] = {
+    active_sessions.set(session_token, {
         "user_id": user_id,
         "username": username
-    }
+    })
     return session_token
 
 
@@ -36,8 +41,7 @@ def get_session(session_token: Optional[str] = None) -> Optional[dict]:
 
 def delete_session(session_token: str):
     """Delete a session"""
-    if session_token in active_sessions:
-        del active_sessions[session_token]
+    active_sessions.pop(session_token)
 
 
 def get_current_user(
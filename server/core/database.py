@@ -1,23 +1,33 @@
 """
 Database connection and session management using SQLAlchemy
 """
+from fastapi import Depends
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, TypeVar
 import os
 
 from server.core.config import DATABASE_PATH
 
 # Create SQLAlchemy engine with better SQLite configuration
-# Enable WAL mode for better concurrent access and add timeout for locks
+# Enable WAL mode for better concurrent access and add timeout for locks.
+# A QueuePool of file connections lets threadpool requests read in parallel under WAL;
+# writers still serialize on SQLite's database lock (busy_timeout makes them wait).
 engine = create_engine(
     f"sqlite:///{DATABASE_PATH}",
     connect_args={
         "check_same_thread": False,  # Needed for SQLite with async
         "timeout": 30.0  # Wait up to 30 seconds for locks to be released
     },
+    poolclass=QueuePool,
     pool_pre_ping=True,  # Verify connections before using them
+    pool_size=20,  # Keep enough connections for bursts of concurrent requests (e.g. many students resuming at once)
+    max_overflow=10,  # Allow temporary extra connections beyond pool_size
+    pool_recycle=3600,  # Replace connections older than an hour
     echo=False  # Set to True for SQL query logging
 )
 
@@ -30,14 +40,266 @@ def set_sqlite_pragma(dbapi_conn, connection_record):
     cursor.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for better concurrency
     cursor.execute("PRAGMA busy_timeout=30000")  # 30 second timeout
     cursor.execute("PRAGMA foreign_keys=ON")  # Enable foreign key constraints
+    cursor.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; skips the fsync on every commit
+    cursor.execute("PRAGMA temp_store=MEMORY")  # Keep temp tables/sort spills in memory
+    cursor.execute("PRAGMA mmap_size=268435456")  # Memory-map up to 256 MB of the database file
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache per connection
     cursor.close()
 
+# Triggers that keep exams.question_count in sync with the questions table
+# (they fire for ORM, bulk and raw SQL writes alike)
+QUESTION_COUNT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_questions_count_insert AFTER INSERT ON questions
+    BEGIN
+        UPDATE exams SET question_count = question_count + 1 WHERE id = NEW.exam_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_questions_count_delete AFTER DELETE ON questions
+    BEGIN
+        UPDATE exams SET question_count = question_count - 1 WHERE id = OLD.exam_id;
+    END
+    """,
+]
+
+# Triggers that keep the per-student dashboard counters (students.assigned_exams_count
+# and students.pending_disputes_count) in sync; only assigned exams count, i.e.
+# exams whose student_id is NULL (practice exams have it set)
+STUDENT_STATS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_submissions_stats_insert AFTER INSERT ON submissions
+    WHEN (SELECT student_id FROM exams WHERE id = NEW.exam_id) IS NULL
+    BEGIN
+        UPDATE students SET assigned_exams_count = assigned_exams_count + 1 WHERE id = NEW.student_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_submissions_stats_delete AFTER DELETE ON submissions
+    WHEN (SELECT student_id FROM exams WHERE id = OLD.exam_id) IS NULL
+    BEGIN
+        UPDATE students SET assigned_exams_count = assigned_exams_count - 1 WHERE id = OLD.student_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_disputes_stats_insert AFTER INSERT ON assigned_exam_disputes
+    WHEN NEW.status = 'pending'
+    BEGIN
+        UPDATE students SET pending_disputes_count = pending_disputes_count + 1
+        WHERE id = (SELECT submissions.student_id FROM submissions JOIN exams ON exams.id = submissions.exam_id
+                    WHERE submissions.id = NEW.submission_id AND exams.student_id IS NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_disputes_stats_delete AFTER DELETE ON assigned_exam_disputes
+    WHEN OLD.status = 'pending'
+    BEGIN
+        UPDATE students SET pending_disputes_count = pending_disputes_count - 1
+        WHERE id = (SELECT submissions.student_id FROM submissions JOIN exams ON exams.id = submissions.exam_id
+                    WHERE submissions.id = OLD.submission_id AND exams.student_id IS NULL);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_disputes_stats_update AFTER UPDATE OF status ON assigned_exam_disputes
+    WHEN (OLD.status = 'pending') != (NEW.status = 'pending')
+    BEGIN
+        UPDATE students SET pending_disputes_count = pending_disputes_count
+            + (NEW.status = 'pending') - (OLD.status = 'pending')
+        WHERE id = (SELECT submissions.student_id FROM submissions JOIN exams ON exams.id = submissions.exam_id
+                    WHERE submissions.id = NEW.submission_id AND exams.student_id IS NULL);
+    END
+    """,
+    # An exam switching between practice and assigned (maintenance scripts set/clear
+    # exams.student_id) moves all of its submissions and pending disputes in or out
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_exams_stats_assigned_update AFTER UPDATE OF student_id ON exams
+    WHEN (OLD.student_id IS NULL) != (NEW.student_id IS NULL)
+    BEGIN
+        UPDATE students SET
+            assigned_exams_count = assigned_exams_count
+                + (CASE WHEN NEW.student_id IS NULL THEN 1 ELSE -1 END) * (
+                    SELECT COUNT(*) FROM submissions
+                    WHERE submissions.exam_id = NEW.id AND submissions.student_id = students.id
+                ),
+            pending_disputes_count = pending_disputes_count
+                + (CASE WHEN NEW.student_id IS NULL THEN 1 ELSE -1 END) * (
+                    SELECT COUNT(*) FROM assigned_exam_disputes
+                    JOIN submissions ON submissions.id = assigned_exam_disputes.submission_id
+                    WHERE submissions.exam_id = NEW.id AND submissions.student_id = students.id
+                        AND assigned_exam_disputes.status = 'pending'
+                )
+        WHERE id IN (SELECT student_id FROM submissions WHERE exam_id = NEW.id);
+    END
+    """,
+]
+
+# Recomputes the per-student dashboard counters from scratch (used to backfill them)
+STUDENT_STATS_BACKFILL = """
+    UPDATE students SET
+        assigned_exams_count = (
+            SELECT COUNT(*) FROM submissions JOIN exams ON exams.id = submissions.exam_id
+            WHERE submissions.student_id = students.id AND exams.student_id IS NULL
+        ),
+        pending_disputes_count = (
+            SELECT COUNT(*) FROM assigned_exam_disputes
+            JOIN submissions ON submissions.id = assigned_exam_disputes.submission_id
+            JOIN exams ON exams.id = submissions.exam_id
+            WHERE submissions.student_id = students.id AND exams.student_id IS NULL
+                AND assigned_exam_disputes.status = 'pending'
+        )
+"""
+
+# Schema version recorded in the database file (PRAGMA user_version) once init_db has run
+# the migrations below. Bump it whenever a migration, trigger or model index is added, so
+# existing databases run them once on their next startup.
+SCHEMA_VERSION = 3
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for models
 Base = declarative_base()
 
+T = TypeVar("T")
+
+
+def migrate_schema():
+    """Bring an existing database up to date with the models (columns, tables, triggers, indexes)
+    
+    Each step checks the current schema first, so running it again is harmless. All steps
+    share one connection, transaction and schema inspector.
+    """
+    from sqlalchemy import inspect, text
+    
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        
+        def column_names(table_name):
+            try:
+                return {col['name'] for col in inspector.get_columns(table_name)}
+            except Exception:
+                # Table might not exist yet
+                return None
+        
+        question_columns = column_names('questions')
+        exam_columns = column_names('exams')
+        
+        # Migrate: Add background_info column if it doesn't exist (for existing databases)
+        if question_columns is not None and 'background_info' not in question_columns:
+            conn.execute(text("ALTER TABLE questions ADD COLUMN background_info TEXT"))
+            print(f"[MIGRATION] Added background_info column to questions table")
+        
+        # Migrate: Add difficulty column to questions table if it doesn't exist
+        # (Older databases were created before per-question difficulty existed.)
+        if question_columns is not None and 'difficulty' not in question_columns:
+            conn.execute(text("ALTER TABLE questions ADD COLUMN difficulty VARCHAR"))
+            print("[MIGRATION] Added difficulty column to questions table")
+        
+        # Migrate: Add student_id column to exams table if it doesn't exist
+        if exam_columns is not None and 'student_id' not in exam_columns:
+            conn.execute(text("ALTER TABLE exams ADD COLUMN student_id TEXT"))
+            print(f"[MIGRATION] Added student_id column to exams table")
+        
+        # Migrate: Add number_of_questions column to exams table if it doesn't exist
+        if exam_columns is not None and 'number_of_questions' not in exam_columns:
+            conn.execute(text("ALTER TABLE exams ADD COLUMN number_of_questions INTEGER"))
+            print(f"[MIGRATION] Added number_of_questions column to exams table")
+        
+        # Migrate: Add llm_response column to regrades table if it doesn't exist
+        regrade_columns = column_names('regrades')
+        if regrade_columns is not None and 'llm_response' not in regrade_columns:
+            conn.execute(text("ALTER TABLE regrades ADD COLUMN llm_response TEXT"))
+            print(f"[MIGRATION] Added llm_response column to regrades table")
+        
+        # Migrate: Create submission_regrades table if it doesn't exist
+        # (Base.metadata.create_all handles this for new databases,
+        #  but for existing databases the table might not exist yet)
+        if 'submission_regrades' not in inspector.get_table_names():
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS submission_regrades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    submission_id INTEGER NOT NULL UNIQUE,
+                    student_argument TEXT NOT NULL,
+                    decision TEXT NOT NULL CHECK(decision IN ('keep','update')),
+                    explanation TEXT NOT NULL,
+                    old_total_score INTEGER,
+                    new_total_score INTEGER,
+                    old_results_json TEXT,
+                    new_results_json TEXT,
+                    model_name TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
+                )
+            """))
+            print(f"[MIGRATION] Created submission_regrades table")
+        
+        # Migrate: Add question_count column to exams table if it doesn't exist,
+        # backfilled from the existing questions
+        if exam_columns is not None and 'question_count' not in exam_columns:
+            conn.execute(text("ALTER TABLE exams ADD COLUMN question_count INTEGER NOT NULL DEFAULT 0"))
+            conn.execute(text(
+                "UPDATE exams SET question_count = "
+                "(SELECT COUNT(*) FROM questions WHERE questions.exam_id = exams.id)"
+            ))
+            print(f"[MIGRATION] Added question_count column to exams table")
+        
+        # Migrate: Add grade_json column to answers table if it doesn't exist
+        answer_columns = column_names('answers')
+        if answer_columns is not None and 'grade_json' not in answer_columns:
+            conn.execute(text("ALTER TABLE answers ADD COLUMN grade_json TEXT"))
+            print(f"[MIGRATION] Added grade_json column to answers table")
+        
+        # Migrate: Add deferred grading failure tracking to answers table if it doesn't exist
+        if answer_columns is not None and not {'grading_attempts', 'grading_failed_at'} <= answer_columns:
+            if 'grading_attempts' not in answer_columns:
+                conn.execute(text("ALTER TABLE answers ADD COLUMN grading_attempts INTEGER NOT NULL DEFAULT 0"))
+            if 'grading_failed_at' not in answer_columns:
+                conn.execute(text("ALTER TABLE answers ADD COLUMN grading_failed_at DATETIME"))
+            print(f"[MIGRATION] Added grading_attempts/grading_failed_at columns to answers table")
+        
+        # Migrate: Add per-student dashboard counters to students table if they don't exist
+        # (backfilled from the existing submissions and disputes after the triggers below)
+        student_columns = column_names('students')
+        if student_columns is not None and not {'assigned_exams_count', 'pending_disputes_count'} <= student_columns:
+            if 'assigned_exams_count' not in student_columns:
+                conn.execute(text("ALTER TABLE students ADD COLUMN assigned_exams_count INTEGER NOT NULL DEFAULT 0"))
+            if 'pending_disputes_count' not in student_columns:
+                conn.execute(text("ALTER TABLE students ADD COLUMN pending_disputes_count INTEGER NOT NULL DEFAULT 0"))
+            print(f"[MIGRATION] Added assigned_exams_count/pending_disputes_count columns to students table")
+        
+        # Create triggers maintaining students.assigned_exams_count/pending_disputes_count
+        # and exams.question_count
+        for trigger_sql in STUDENT_STATS_TRIGGERS + QUESTION_COUNT_TRIGGERS:
+            try:
+                conn.execute(text(trigger_sql))
+            except Exception as e:
+                print(f"[MIGRATION] Could not create trigger: {e}")
+        
+        # Recompute the student counters once per schema upgrade, correcting any drift from
+        # before all of their triggers existed (e.g. exams re-marked as assigned/practice)
+        if student_columns is not None:
+            try:
+                conn.execute(text(STUDENT_STATS_BACKFILL))
+            except Exception as e:
+                print(f"[MIGRATION] Could not recompute student stats: {e}")
+        
+        # Migrate: Create any indexes declared on the models that don't exist yet
+        # (create_all only creates indexes together with their table, so existing
+        #  databases would otherwise never pick up newly added indexes)
+        existing_indexes = {
+            index['name']
+            for table_name in inspector.get_table_names()
+            for index in inspector.get_indexes(table_name)
+        }
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    try:
+                        index.create(bind=conn)
+                        print(f"[MIGRATION] Created index {index.name}")
+                    except Exception as e:
+                        print(f"[MIGRATION] Could not create index {index.name}: {e}")
+
 
 def init_db():
     """Initialize database by creating all tables"""
@@ -50,104 +312,17 @@ def init_db():
     # Create all tables
     Base.metadata.create_all(bind=engine)
     
-    # Migrate: Add background_info column if it doesn't exist (for existing databases)
-    try:
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        columns = [col['name'] for col in inspector.get_columns('questions')]
-        if 'background_info' not in columns:
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE questions ADD COLUMN background_info TEXT"))
-                conn.commit()
-            print(f"[MIGRATION] Added background_info column to questions table")
-    except Exception as e:
-        # Ignore errors (column might already exist or table might not exist yet)
-        pass
-
-    # Migrate: Add difficulty column to questions table if it doesn't exist
-    # (Older databases were created before per-question difficulty existed.)
-    try:
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        columns = [col["name"] for col in inspector.get_columns("questions")]
-        if "difficulty" not in columns:
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE questions ADD COLUMN difficulty VARCHAR"))
-                conn.commit()
-            print("[MIGRATION] Added difficulty column to questions table")
-    except Exception:
-        # Ignore errors (column might already exist or table might not exist yet)
-        pass
-    
-    # Migrate: Add student_id column to exams table if it doesn't exist
-    try:
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        columns = [col['name'] for col in inspector.get_columns('exams')]
-        if 'student_id' not in columns:
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE exams ADD COLUMN student_id TEXT"))
-                conn.commit()
-            print(f"[MIGRATION] Added student_id column to exams table")
-    except Exception as e:
-        # Ignore errors (column might already exist or table might not exist yet)
-        pass
-    
-    # Migrate: Add number_of_questions column to exams table if it doesn't exist
-    try:
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        columns = [col['name'] for col in inspector.get_columns('exams')]
-        if 'number_of_questions' not in columns:
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE exams ADD COLUMN number_of_questions INTEGER"))
-                conn.commit()
-            print(f"[MIGRATION] Added number_of_questions column to exams table")
-    except Exception as e:
-        # Ignore errors (column might already exist or table might not exist yet)
-        pass
-    
-    # Migrate: Add llm_response column to regrades table if it doesn't exist
-    try:
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        columns = [col['name'] for col in inspector.get_columns('regrades')]
-        if 'llm_response' not in columns:
-            with engine.connect() as conn:
-                conn.execute(text("ALTER TABLE regrades ADD COLUMN llm_response TEXT"))
-                conn.commit()
-            print(f"[MIGRATION] Added llm_response column to regrades table")
-    except Exception as e:
-        pass
-    
-    # Migrate: Create submission_regrades table if it doesn't exist
-    # (Base.metadata.create_all above handles this for new databases,
-    #  but for existing databases the table might not exist yet)
-    try:
-        from sqlalchemy import inspect, text
-        inspector = inspect(engine)
-        if 'submission_regrades' not in inspector.get_table_names():
-            with engine.connect() as conn:
-                conn.execute(text("""
-                    CREATE TABLE IF NOT EXISTS submission_regrades (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        submission_id INTEGER NOT NULL UNIQUE,
-                        student_argument TEXT NOT NULL,
-                        decision TEXT NOT NULL CHECK(decision IN ('keep','update')),
-                        explanation TEXT NOT NULL,
-                        old_total_score INTEGER,
-                        new_total_score INTEGER,
-                        old_results_json TEXT,
-                        new_results_json TEXT,
-                        model_name TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (submission_id) REFERENCES submissions(id) ON DELETE CASCADE
-                    )
-                """))
-                conn.commit()
-            print(f"[MIGRATION] Created submission_regrades table")
-    except Exception as e:
-        pass
+    # Run the migrations only for databases older than SCHEMA_VERSION; up-to-date
+    # databases skip the per-table schema inspection entirely
+    from sqlalchemy import text
+    with engine.connect() as conn:
+        schema_version = conn.execute(text("PRAGMA user_version")).scalar()
+    if schema_version < SCHEMA_VERSION:
+        migrate_schema()
+        with engine.connect() as conn:
+            conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+            conn.commit()
+        print(f"[MIGRATION] Database schema is now at version {SCHEMA_VERSION}")
     
     print(f"Database initialized at: {DATABASE_PATH}")
 
@@ -167,6 +342,41 @@ def get_db() -> Session:
         db.close()
 
 
+def get_db_for_reads(db: Session = Depends(get_db)) -> Session:
+    """
+    Dependency for endpoints that only read: the request's session (the one authentication
+    already uses, so no second pooled connection is checked out) tuned for plain reads
+    Usage: db: Session = Depends(get_db_for_reads)
+    Note: this does not make the session read-only; auth helpers such as get-or-create
+    may still write and commit through it. Autoflush is off and loaded objects are not
+    expired by a commit for the rest of the request, so handlers should select the
+    columns they return rather than whole ORM objects
+    """
+    db.autoflush = False
+    db.expire_on_commit = False
+    return db
+
+
+async def run_in_session(fn: Callable[[Session], T]) -> T:
+    """
+    Run fn(session) in a worker thread with its own short-lived session
+    Independent read queries of one request can be run concurrently this way:
+        rows_a, rows_b = await asyncio.gather(
+            run_in_session(lambda session: session.execute(stmt_a).all()),
+            run_in_session(lambda session: session.execute(stmt_b).all()),
+        )
+    Note: the session is closed before returning, so fn should return plain rows/values
+    rather than ORM instances that need lazy loading later
+    """
+    def run():
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+    return await run_in_threadpool(run)
+
+
 @contextmanager
 def get_db_session():
     """
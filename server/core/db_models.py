@@ -2,7 +2,7 @@
 SQLAlchemy ORM models matching the ERD schema
 Compatible with Python 3.11+ (tested on 3.11 and 3.13)
 """
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, desc, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -58,6 +58,8 @@ class Student(Base):
     name = Column(String, nullable=False)
     email = Column(String)
     class_name = Column(String, nullable=True)  # Class/course name (e.g., "CS101", "Math 201")
+    assigned_exams_count = Column(Integer, nullable=False, default=0, server_default="0")  # Denormalized COUNT of assigned-exam submissions, kept up to date by triggers
+    pending_disputes_count = Column(Integer, nullable=False, default=0, server_default="0")  # Denormalized COUNT of pending assigned-exam disputes, kept up to date by triggers
     created_at = Column(DateTime, nullable=False, default=utc_now, server_default=func.now())
     
     # Relationships
@@ -80,6 +82,7 @@ class Exam(Base):
     time_limit_minutes = Column(Integer, nullable=True)  # Time limit in minutes (NULL = no time limit)
     prevent_tab_switching = Column(Integer, nullable=True, default=0)  # Prevent tab switching (0 = false, 1 = true)
     due_date = Column(DateTime, nullable=True)  # Due date for the exam (NULL = no due date)
+    question_count = Column(Integer, nullable=False, default=0, server_default="0")  # Denormalized COUNT of questions, kept up to date by triggers on questions
     created_at = Column(DateTime, nullable=False, default=utc_now, server_default=func.now())
     
     # Relationships
@@ -87,6 +90,14 @@ class Exam(Base):
     student = relationship("Student", foreign_keys=[student_id], primaryjoin="Exam.student_id == Student.student_id", viewonly=True)
     questions = relationship("Question", back_populates="exam", cascade="all, delete-orphan")
     submissions = relationship("Submission", back_populates="exam", cascade="all, delete-orphan")
+    
+    # Indexes
+    __table_args__ = (
+        # Practice exam lookups by campus ID (assigned exams have student_id NULL)
+        Index("idx_exam_student_id", "student_id", sqlite_where=text("student_id IS NOT NULL")),
+        # Instructor dashboard: an instructor's assigned exams, newest first
+        Index("idx_exam_instructor_assigned_created", "instructor_id", desc("created_at"), sqlite_where=text("student_id IS NULL")),
+    )
 
 
 class Question(Base):
@@ -143,11 +154,17 @@ class Submission(Base):
     student = relationship("Student", back_populates="submissions")
     answers = relationship("Answer", back_populates="submission", cascade="all, delete-orphan")
     submission_regrade = relationship("SubmissionRegrade", back_populates="submission", uselist=False, cascade="all, delete-orphan")
-    assigned_disputes = relationship("AssignedExamDispute", back_populates="submission", cascade="all, delete-orphan")
+    assigned_disputes = relationship("AssignedExamDispute", back_populates="submission", cascade="all, delete-orphan", order_by="(AssignedExamDispute.question_id, AssignedExamDispute.id)")  # Overall dispute (question_id NULL) first
     
     # Indexes
     __table_args__ = (
         Index("idx_submission_exam_student_started", "exam_id", "student_id", "started_at"),
+        # Matches "exam_id = ? AND student_id = ? AND submitted_at IS NULL ORDER BY started_at DESC"
+        Index("idx_submission_exam_student_submitted_started", "exam_id", "student_id", "submitted_at", desc("started_at")),
+        # Matches "student_id = ? AND submitted_at IS NULL ORDER BY started_at DESC"
+        Index("idx_submission_student_submitted_started", "student_id", "submitted_at", desc("started_at")),
+        # Partial index over in-progress submissions only (most rows are already submitted)
+        Index("idx_submission_open_student_started", "student_id", desc("started_at"), sqlite_where=text("submitted_at IS NULL")),
     )
 
 
@@ -163,9 +180,12 @@ class Answer(Base):
     # LLM grading outputs
     llm_score = Column(Float)
     llm_feedback = Column(Text)
+    grade_json = Column(Text)  # Full structured grade from the LLM (scores, explanation, rubric_breakdown, annotations)
     graded_at = Column(DateTime)
     grading_model_name = Column(String)  # useful if different from exam model
     grading_temperature = Column(Float)
+    grading_attempts = Column(Integer, nullable=False, default=0, server_default="0")  # Failed deferred grading attempts
+    grading_failed_at = Column(DateTime)  # Set once deferred grading gave up on the answer
     
     # Instructor manual grading (overrides LLM grading when set)
     instructor_edited = Column(Integer, default=0)  # 0 = false, 1 = true
@@ -181,6 +201,8 @@ class Answer(Base):
     # Indexes
     __table_args__ = (
         Index("idx_answer_submission_question", "submission_id", "question_id", unique=True),
+        # Latest graded answer for a question ("question_id = ? ORDER BY graded_at DESC")
+        Index("idx_answer_question_graded", "question_id", desc("graded_at")),
     )
 
 
@@ -245,6 +267,10 @@ class AssignedExamDispute(Base):
     # Indexes
     __table_args__ = (
         Index("idx_dispute_submission_question", "submission_id", "question_id"),
+        # Pending/resolved dispute lookups per submission
+        Index("idx_dispute_submission_status", "submission_id", "status"),
+        # Instructor dashboard: pending disputes, newest first
+        Index("idx_dispute_status_created", "status", desc("created_at")),
     )
 
 
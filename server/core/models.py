@@ -26,8 +26,8 @@ class QuestionData(BaseModel):
 
 class StudentResponse(BaseModel):
     """Request model for submitting student responses"""
-    exam_id: str
-    question_id: str
+    exam_id: int  # Numeric strings sent by the client are coerced (invalid ids get a 422)
+    question_id: int
     response_text: str
     time_spent_seconds: Optional[int] = None
 
@@ -0,0 +1,46 @@
+"""
+Script to add grade_json column to answers table
+The column stores the full structured LLM grade (scores, explanation, rubric breakdown, annotations)
+"""
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import sqlite3
+
+def add_grade_json_column():
+    """Add grade_json column to answers table"""
+    print("=" * 60)
+    print("Adding grade_json column to answers table...")
+    print("=" * 60)
+    
+    # Get database path
+    from server.core.config import DATABASE_PATH
+    
+    # Connect directly to SQLite to add column
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        # Check if column already exists
+        cursor.execute("PRAGMA table_info(answers)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'grade_json' in columns:
+            print("Column 'grade_json' already exists in answers table.")
+        else:
+            cursor.execute("ALTER TABLE answers ADD COLUMN grade_json TEXT")
+            conn.commit()
+            print("Successfully added 'grade_json' column to answers table.")
+        
+    except Exception as e:
+        print(f"Error adding column: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_grade_json_column()
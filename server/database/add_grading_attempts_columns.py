@@ -0,0 +1,49 @@
+"""
+Script to add grading_attempts and grading_failed_at columns to answers table
+The columns track failed deferred grading attempts so answers that keep failing leave the grading queue
+"""
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import sqlite3
+
+def add_grading_attempts_columns():
+    """Add the deferred grading failure tracking columns to answers table"""
+    print("=" * 60)
+    print("Adding grading_attempts/grading_failed_at columns to answers table...")
+    print("=" * 60)
+    
+    # Get database path
+    from server.core.config import DATABASE_PATH
+    
+    # Connect directly to SQLite to add columns
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        # Check if columns already exist
+        cursor.execute("PRAGMA table_info(answers)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'grading_attempts' in columns and 'grading_failed_at' in columns:
+            print("Columns 'grading_attempts' and 'grading_failed_at' already exist in answers table.")
+        else:
+            if 'grading_attempts' not in columns:
+                cursor.execute("ALTER TABLE answers ADD COLUMN grading_attempts INTEGER NOT NULL DEFAULT 0")
+            if 'grading_failed_at' not in columns:
+                cursor.execute("ALTER TABLE answers ADD COLUMN grading_failed_at DATETIME")
+            conn.commit()
+            print("Successfully added deferred grading failure tracking columns to answers table.")
+        
+    except Exception as e:
+        print(f"Error adding columns: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_grading_attempts_columns()
@@ -0,0 +1,57 @@
+"""
+Script to add question_count column to exams table
+The column caches the number of questions per exam and is kept in sync by triggers
+"""
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import sqlite3
+
+def add_question_count_column():
+    """Add question_count column to exams table and the triggers maintaining it"""
+    print("=" * 60)
+    print("Adding question_count column to exams table...")
+    print("=" * 60)
+    
+    # Get database path
+    from server.core.config import DATABASE_PATH
+    from server.core.database import QUESTION_COUNT_TRIGGERS
+    
+    # Connect directly to SQLite to add column
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        # Check if column already exists
+        cursor.execute("PRAGMA table_info(exams)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'question_count' in columns:
+            print("Column 'question_count' already exists in exams table.")
+        else:
+            # Add the column and backfill it from existing questions
+            cursor.execute("ALTER TABLE exams ADD COLUMN question_count INTEGER NOT NULL DEFAULT 0")
+            cursor.execute(
+                "UPDATE exams SET question_count = "
+                "(SELECT COUNT(*) FROM questions WHERE questions.exam_id = exams.id)"
+            )
+            print("Successfully added 'question_count' column to exams table.")
+        
+        # Create triggers (no-op if they already exist)
+        for trigger_sql in QUESTION_COUNT_TRIGGERS:
+            cursor.execute(trigger_sql)
+        conn.commit()
+        print("question_count triggers are in place.")
+        
+    except Exception as e:
+        print(f"Error adding column: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_question_count_column()
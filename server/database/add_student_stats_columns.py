@@ -0,0 +1,57 @@
+"""
+Script to add assigned_exams_count and pending_disputes_count columns to students table
+The columns cache the per-student counts shown on the instructor dashboard and are kept in sync by triggers
+"""
+import sys
+import os
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import sqlite3
+
+def add_student_stats_columns():
+    """Add the per-student dashboard counters to students table and the triggers maintaining them"""
+    print("=" * 60)
+    print("Adding assigned_exams_count/pending_disputes_count columns to students table...")
+    print("=" * 60)
+    
+    # Get database path
+    from server.core.config import DATABASE_PATH
+    from server.core.database import STUDENT_STATS_TRIGGERS, STUDENT_STATS_BACKFILL
+    
+    # Connect directly to SQLite to add columns
+    conn = sqlite3.connect(DATABASE_PATH)
+    cursor = conn.cursor()
+    
+    try:
+        # Check if columns already exist
+        cursor.execute("PRAGMA table_info(students)")
+        columns = [column[1] for column in cursor.fetchall()]
+        
+        if 'assigned_exams_count' in columns and 'pending_disputes_count' in columns:
+            print("Columns 'assigned_exams_count' and 'pending_disputes_count' already exist in students table.")
+        else:
+            # Add the columns and backfill them from existing submissions and disputes
+            if 'assigned_exams_count' not in columns:
+                cursor.execute("ALTER TABLE students ADD COLUMN assigned_exams_count INTEGER NOT NULL DEFAULT 0")
+            if 'pending_disputes_count' not in columns:
+                cursor.execute("ALTER TABLE students ADD COLUMN pending_disputes_count INTEGER NOT NULL DEFAULT 0")
+            cursor.execute(STUDENT_STATS_BACKFILL)
+            print("Successfully added student dashboard counter columns to students table.")
+        
+        # Create triggers (no-op if they already exist)
+        for trigger_sql in STUDENT_STATS_TRIGGERS:
+            cursor.execute(trigger_sql)
+        conn.commit()
+        print("Student stats triggers are in place.")
+        
+    except Exception as e:
+        print(f"Error adding columns: {e}")
+        conn.rollback()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    add_student_stats_columns()
@@ -36,6 +36,8 @@ CREATE TABLE IF NOT EXISTS students (
     student_id VARCHAR NOT NULL UNIQUE,
     name VARCHAR NOT NULL,
     email VARCHAR,
+    assigned_exams_count INTEGER NOT NULL DEFAULT 0,  -- Denormalized number of assigned-exam submissions (maintained by triggers)
+    pending_disputes_count INTEGER NOT NULL DEFAULT 0,  -- Denormalized number of pending assigned-exam disputes (maintained by triggers)
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -51,6 +53,7 @@ CREATE TABLE IF NOT EXISTS exams (
     prevent_tab_switching INTEGER DEFAULT 0,
     model_name VARCHAR,
     temperature REAL,
+    question_count INTEGER NOT NULL DEFAULT 0,  -- Denormalized number of questions (maintained by triggers below)
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (instructor_id) REFERENCES instructors(id)
 );
@@ -103,9 +106,12 @@ CREATE TABLE IF NOT EXISTS answers (
     student_answer TEXT NOT NULL,
     llm_score REAL,
     llm_feedback TEXT,
+    grade_json TEXT,  -- Full structured LLM grade as JSON (query with json_extract)
     graded_at TIMESTAMP,
     grading_model_name VARCHAR,
     grading_temperature REAL,
+    grading_attempts INTEGER NOT NULL DEFAULT 0,  -- Failed deferred grading attempts
+    grading_failed_at TIMESTAMP,  -- Set once deferred grading gave up on the answer
     FOREIGN KEY (submission_id) REFERENCES submissions(id),
     FOREIGN KEY (question_id) REFERENCES questions(id),
     UNIQUE(submission_id, question_id)  -- Ensures exact one-to-one mapping: one answer per question per submission
@@ -163,6 +169,39 @@ CREATE INDEX IF NOT EXISTS idx_submission_exam_student_started
 CREATE INDEX IF NOT EXISTS idx_answer_submission_question 
     ON answers(submission_id, question_id);
 
+CREATE INDEX IF NOT EXISTS idx_submission_student_submitted_started
+    ON submissions(student_id, submitted_at, started_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_submission_exam_student_submitted_started
+    ON submissions(exam_id, student_id, submitted_at, started_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_answer_question_graded
+    ON answers(question_id, graded_at DESC);
+
+-- Partial index: only in-progress submissions (submitted_at IS NULL)
+CREATE INDEX IF NOT EXISTS idx_submission_open_student_started
+    ON submissions(student_id, started_at DESC)
+    WHERE submitted_at IS NULL;
+
+-- ============================================================================
+-- Triggers
+-- ============================================================================
+
+-- Keep exams.question_count in sync with the questions table
+CREATE TRIGGER IF NOT EXISTS trg_questions_count_insert AFTER INSERT ON questions
+BEGIN
+    UPDATE exams SET question_count = question_count + 1 WHERE id = NEW.exam_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_questions_count_delete AFTER DELETE ON questions
+BEGIN
+    UPDATE exams SET question_count = question_count - 1 WHERE id = OLD.exam_id;
+END;
+
+-- students.assigned_exams_count / pending_disputes_count are kept in sync by the
+-- STUDENT_STATS_TRIGGERS in server/core/database.py (they depend on exams.student_id
+-- and assigned_exam_disputes, which are added by later migrations)
+
 -- ============================================================================
 -- Notes for DBeaver:
 -- ============================================================================
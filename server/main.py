@@ -4,14 +4,18 @@ Handles question generation, student responses, and AI-powered grading
 
 to run server: uvicorn server.main:app
 """
+import asyncio
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from server.core.config import CLIENT_STATIC_DIR
 from server.core.middleware import LoggingMiddleware
 from server.core.database import init_db
-from server.api import router as api_router
+from server.core.llm_service import close_http_client
+from server.api import router as api_router, run_grading_worker
 from server.frontend import router as frontend_router
 
 # Create FastAPI app
@@ -20,7 +24,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse  # orjson serializes the large exam/answer payloads much faster
 )
 
 
@@ -36,6 +41,18 @@ async def startup_event():
     # Initialize database (creates tables if they don't exist)
     init_db()
     print("✓ Database initialized")
+    
+    # Start the background worker that grades deferred responses in batches
+    app.state.grading_worker = asyncio.create_task(run_grading_worker())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks and close the shared LLM HTTP client"""
+    grading_worker = getattr(app.state, "grading_worker", None)
+    if grading_worker:
+        grading_worker.cancel()
+    await close_http_client()
 
 # Add middleware
 app.add_middleware(LoggingMiddleware)
@@ -79,9 +79,13 @@ def main():
         ("server/database/add_time_limit_fields.py", "Add time limit fields migration"),
         ("server/database/add_instructor_grading_fields.py", "Add instructor grading fields migration"),
         ("server/database/add_number_of_questions_column.py", "Add number_of_questions column migration"),
+        ("server/database/add_question_count_column.py", "Add question_count column migration"),
+        ("server/database/add_grade_json_column.py", "Add grade_json column migration"),
         ("server/database/add_prevent_tab_switching.py", "Add prevent_tab_switching column migration"),
         ("server/database/add_due_date_field.py", "Add due_date field migration"),
         ("server/database/add_assigned_exam_disputes_table.py", "Add assigned exam disputes table migration"),
+        ("server/database/add_student_stats_columns.py", "Add student dashboard counters migration"),
+        ("server/database/add_grading_attempts_columns.py", "Add deferred grading failure tracking migration"),
         ("server/database/seed_data.py", "Seed initial user data"),
         ("server/database/assign_classes_to_students.py", "Assign classes to students"),
     ]